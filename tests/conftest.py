@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Random gt and predictions shared by the tests. The factories are fixtures, so test modules don't need to
+import each other.
+"""
+
+import random
+
+import pytest
+import tidecv
+
+
+def _make_images(
+    seed, num_images=20, num_classes=3, max_gt=5, max_preds=10, ignore_regions=True, ties=False
+):
+    """
+    Returns a list of (image_id, gts, preds) in the format TIDEStream.add takes, where most predictions are
+    jittered copies of a gt. With ties=True, scores are rounded to one decimal so that lots of them are equal.
+    """
+    rng = random.Random(seed)
+    images = []
+
+    for image_id in range(num_images):
+        gts, preds = [], []
+        for _ in range(rng.randint(0, max_gt)):
+            x, y = rng.uniform(0, 200), rng.uniform(0, 200)
+            box = [x, y, x + rng.uniform(5, 60), y + rng.uniform(5, 60)]
+            gts.append({"class": rng.randint(1, num_classes), "bbox": box})
+
+        if ignore_regions and gts and rng.random() < 0.2:
+            gts.append({"class": -1, "bbox": [0, 0, 50, 50], "ignore": True})
+
+        for _ in range(rng.randint(0, max_preds)):
+            if gts and rng.random() < 0.7:
+                truth = rng.choice([x for x in gts if not x.get("ignore", False)])
+                class_id = truth["class"] if rng.random() < 0.8 else rng.randint(1, num_classes)
+                box = [v + rng.uniform(-12, 12) for v in truth["bbox"]]
+            else:
+                x, y = rng.uniform(0, 200), rng.uniform(0, 200)
+                box = [x, y, x + rng.uniform(5, 60), y + rng.uniform(5, 60)]
+                class_id = rng.randint(1, num_classes)
+            score = round(rng.random(), 1) if ties else rng.random()
+            preds.append({"class": class_id, "bbox": box, "score": score})
+
+        images.append((image_id, gts, preds))
+
+    return images
+
+
+def _to_data(images):
+    """Converts the output of make_images to a gt and a predictions Data object."""
+    ground_truths = tidecv.Data("gt")
+    predictions = tidecv.Data("preds")
+
+    for image_id, gts, preds in images:
+        for truth in gts:
+            if truth.get("ignore", False):
+                ground_truths.add_ignore_region(image_id, truth["class"], box=truth["bbox"])
+            else:
+                ground_truths.add_ground_truth(image_id, truth["class"], box=truth["bbox"])
+        for pred in preds:
+            predictions.add_detection(image_id, pred["class"], pred["score"], box=pred["bbox"])
+
+    return ground_truths, predictions
+
+
+@pytest.fixture
+def make_images():
+    return _make_images
+
+
+@pytest.fixture
+def to_data():
+    return _to_data
+
+
+@pytest.fixture
+def make_data():
+    """Returns a function that takes the same arguments as make_images and returns a (gt, preds) pair of Data."""
+    return lambda *args, **kwargs: _to_data(_make_images(*args, **kwargs))
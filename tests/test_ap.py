@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the array-based AP computation against the original loop-based one.
+"""
+
+import random
+
+import numpy as np
+import pytest
+from tidecv.ap import APDataObject, ClassedAPDataObject, CompactClassedAPDataObject
+
+
+def reference_ap(data_points: list, num_gt_positives: int) -> float:
+    """The loop-based AP computation TIDE started out with."""
+    if num_gt_positives == 0:
+        return 0
+
+    data_points = sorted(data_points, key=lambda x: -x[0])
+
+    precisions, recalls = [], []
+    num_true = num_false = 0
+    for score, is_true in data_points:
+        if is_true:
+            num_true += 1
+        else:
+            num_false += 1
+        precisions.append(num_true / (num_true + num_false))
+        recalls.append(num_true / num_gt_positives)
+
+    for i in range(len(precisions) - 1, 0, -1):
+        if precisions[i] > precisions[i - 1]:
+            precisions[i - 1] = precisions[i]
+
+    x_range = np.array([x / 100 for x in range(101)])
+    y_range = [0] * 101
+    indices = np.searchsorted(np.array(recalls), x_range, side="left")
+    for bar_idx, precision_idx in enumerate(indices):
+        if precision_idx < len(precisions):
+            y_range[bar_idx] = precisions[precision_idx]
+
+    return sum(y_range) / len(y_range) * 100
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("num_points,num_gt", [(0, 3), (1, 1), (20, 10), (300, 50)])
+def test_get_ap_matches_reference(seed, num_points, num_gt):
+    """The vectorized AP should match the loop-based AP, including ties in score."""
+    rng = random.Random(seed)
+    obj = APDataObject()
+    points = []
+
+    for i in range(num_points):
+        # Round the scores so that there are plenty of ties
+        score, is_true = round(rng.random(), 1), rng.random() < 0.5
+        obj.push(i, score, is_true)
+        points.append((score, is_true))
+
+    obj.add_gt_positives(num_gt)
+
+    assert obj.get_ap() == pytest.approx(reference_ap(points, num_gt))
+
+
+def test_get_ap_cache_cleared_on_push():
+    """Pushing more data should invalidate the cached AP and curve."""
+    obj = APDataObject()
+    obj.add_gt_positives(2)
+    obj.push(0, 0.9, True)
+
+    assert obj.get_ap() == pytest.approx(50.49504950495049)
+    first_curve = obj.get_pr_curve()
+
+    obj.push(1, 0.8, True)
+    assert obj.get_ap() == pytest.approx(100)
+    assert obj.get_pr_curve() is not first_curve
+
+    obj.add_gt_positives(2)
+    assert obj.get_ap() == pytest.approx(reference_ap([(0.9, True), (0.8, True)], 4))
+
+
+def test_no_gt_gives_zero():
+    """A class with only false positives has an AP of 0."""
+    obj = APDataObject()
+    obj.push(0, 0.9, False)
+    assert obj.get_ap() == 0
+
+
+def test_classed_pr_curve_average():
+    """The class-averaged PR curve is the mean of the per-class curves."""
+    data = ClassedAPDataObject()
+    data.add_gt_positives(1, 1)
+    data.add_gt_positives(2, 1)
+    data.push(1, 0, 0.9, True)
+    data.push(2, 1, 0.9, False)
+
+    x_range, y_range = data.get_pr_curve()
+    assert len(x_range) == len(y_range) == 101
+    assert np.allclose(y_range, 0.5)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_compact_matches_dicts(seed):
+    """Pushing arrays to the compact AP data gives the same data points and AP as pushing dicts."""
+    rng = np.random.default_rng(seed)
+    data, compact = ClassedAPDataObject(), CompactClassedAPDataObject()
+
+    for image in range(10):
+        num_points = int(rng.integers(0, 8))
+        classes = rng.integers(1, 4, num_points)
+        ids = np.arange(num_points) + image * 10
+        scores = rng.random(num_points).round(1)
+        is_true = rng.random(num_points) < 0.5
+        ious = rng.random(num_points)
+        matched_with = np.where(is_true, ids + 1000, -1)
+
+        for obj in (data, compact):
+            for _cls in range(1, 4):
+                obj.add_gt_positives(_cls, 2)
+            obj.push_arrays(classes, ids, scores, is_true, ious, matched_with)
+            obj.push_false_negatives(classes[~is_true], ids[~is_true] + 1000)
+
+    assert list(compact.objs) == list(data.objs)
+    for _cls, obj in compact.objs.items():
+        assert obj.data_points == data.objs[_cls].data_points
+        assert obj.false_negatives == data.objs[_cls].false_negatives
+        assert obj.get_ap() == data.objs[_cls].get_ap()
+        assert [x.tolist() for x in obj._get_sorted_ids()] == [
+            x.tolist() for x in data.objs[_cls]._get_sorted_ids()
+        ]
+    assert compact.get_mAP() == data.get_mAP()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized box IoU kernel against a straightforward pairwise implementation.
+"""
+
+import random
+
+import numpy as np
+import pytest
+import tidecv
+
+
+def reference_iou(a, b):
+    xi, yi = max(a[0], b[0]), max(a[1], b[1])
+    x2i, y2i = min(a[2], b[2]), min(a[3], b[3])
+
+    Aa = max(a[2] - a[0], 0) * max(a[3] - a[1], 0)
+    Ab = max(b[2] - b[0], 0) * max(b[3] - b[1], 0)
+    Ai = max(x2i - xi, 0) * max(y2i - yi, 0)
+
+    return Ai / (Aa + Ab - Ai)
+
+
+def random_boxes(rng, n):
+    boxes = []
+    for _ in range(n):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        boxes.append([x, y, x + rng.uniform(1, 50), y + rng.uniform(1, 50)])
+    return boxes
+
+
+@pytest.mark.parametrize("num_dets,num_gt", [(1, 1), (7, 3), (100, 20), (5, 0)])
+def test_box_iou_matches_pairwise(num_dets, num_gt):
+    """Every entry of the IoU matrix should equal the pairwise computation."""
+    rng = random.Random(num_dets * 31 + num_gt)
+    dets = random_boxes(rng, num_dets)
+    gts = random_boxes(rng, num_gt)
+
+    iou = tidecv.box_iou(dets, gts)
+
+    assert iou.shape == (num_dets, num_gt)
+    for i, d in enumerate(dets):
+        for j, g in enumerate(gts):
+            assert iou[i, j] == reference_iou(d, g)
+
+
+@pytest.mark.parametrize(
+    "det,gt,expected",
+    [
+        ([10, 10, 50, 50], [10, 10, 50, 50], 1.0),
+        ([0, 0, 10, 10], [20, 20, 30, 30], 0.0),
+        ([0, 0, 10, 10], [5, 0, 15, 10], 1 / 3),
+    ],
+)
+def test_box_iou_known_values(det, gt, expected):
+    """Simple hand-computed cases."""
+    iou = tidecv.box_iou(np.array([det]), np.array([gt]))
+    assert iou[0, 0] == pytest.approx(expected)
+
+
+def test_box_iou_crowd():
+    """Crowd columns are the intersection over the detection area, the others are unchanged."""
+    dets = [[0, 0, 10, 10], [5, 0, 15, 10]]
+    gts = [[0, 0, 100, 100], [0, 0, 100, 100]]
+
+    iou = tidecv.box_iou(dets, gts, iscrowd=[True, False])
+
+    assert iou[:, 0] == pytest.approx([1.0, 1.0])
+    assert iou[:, 1] == pytest.approx([0.01, 0.01])
+
+
+def test_box_iou_degenerate_boxes():
+    """Boxes with no area have an IoU of 0 with everything instead of nan, crowd regions included."""
+    dets = [[5, 5, 5, 5], [0, 0, 10, 10]]
+    gts = [[5, 5, 5, 5], [0, 0, 10, 0]]
+
+    assert tidecv.box_iou(dets, gts).tolist() == [[0, 0], [0, 0]]
+    assert tidecv.box_iou(dets, gts, iscrowd=[True, True])[0].tolist() == [0, 0]
+
+
+def test_evaluate_degenerate_boxes():
+    """A zero-area gt and prediction can't match anything, but shouldn't stop the rest of the image."""
+    gt = tidecv.Data("gt")
+    gt.add_ground_truth(0, 1, box=[5, 5, 5, 5])
+    gt.add_ground_truth(0, 1, box=[20, 20, 40, 40])
+
+    preds = tidecv.Data("preds")
+    preds.add_detection(0, 1, 0.9, box=[5, 5, 5, 5])
+    preds.add_detection(0, 1, 0.8, box=[20, 20, 40, 40])
+
+    run = tidecv.TIDE().evaluate(gt, preds)
+
+    assert sorted((type(x).__name__, x.get_id()) for x in run.errors) == [
+        ("BackgroundError", 0),
+        ("MissedError", 0),
+    ]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized error classification against the per-prediction checks it replaced.
+"""
+
+import random
+
+import pytest
+import tidecv
+from tidecv.quantify import TIDEExample
+
+
+def make_example(seed, pos_thresh):
+    rng = random.Random(seed)
+    gt, preds = [], []
+
+    for _id in range(rng.randint(1, 6)):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        box = [x, y, x + rng.uniform(5, 40), y + rng.uniform(5, 40)]
+        gt.append({"_id": _id, "class": rng.randint(1, 3), "bbox": box, "mask": None, "ignore": False})
+
+    for _id in range(rng.randint(1, 15)):
+        box = [v + rng.uniform(-15, 15) for v in rng.choice(gt)["bbox"]]
+        box = [min(box[0], box[2] - 1), min(box[1], box[3] - 1), box[2], box[3]]
+        preds.append({"_id": _id, "class": rng.randint(1, 3), "score": rng.random(), "bbox": box, "mask": None})
+
+    return TIDEExample(preds, gt, pos_thresh, tidecv.TIDE.BOX, 100)
+
+
+def reference_classify(ex, bg_thresh):
+    """The checks _eval_image used to do one prediction at a time."""
+    pos_thresh = ex.pos_thresh
+    gt_used_cls = ex.gt_cls_iou * (ex.gt_matched_pred >= 0)[None, :]
+    results = []
+
+    for pred_idx in range(len(ex.preds)):
+        if ex.pred_matches[pred_idx] >= 0:
+            continue
+
+        idx = ex.gt_cls_iou[pred_idx].argmax()
+        if bg_thresh <= ex.gt_cls_iou[pred_idx, idx] <= pos_thresh:
+            results.append((pred_idx, tidecv.BoxError, idx))
+            continue
+
+        idx = ex.gt_noncls_iou[pred_idx].argmax()
+        if ex.gt_noncls_iou[pred_idx, idx] >= pos_thresh:
+            results.append((pred_idx, tidecv.ClassError, idx))
+            continue
+
+        idx = gt_used_cls[pred_idx].argmax()
+        if gt_used_cls[pred_idx, idx] >= pos_thresh:
+            results.append((pred_idx, tidecv.DuplicateError, idx))
+            continue
+
+        if ex.gt_iou[pred_idx].max() <= bg_thresh:
+            results.append((pred_idx, tidecv.BackgroundError, -1))
+            continue
+
+        results.append((pred_idx, tidecv.OtherError, -1))
+
+    return results
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("pos_thresh", [0.5, 0.75])
+def test_classify_errors_matches_reference(seed, pos_thresh):
+    ex = make_example(seed, pos_thresh)
+    pred_idx, codes, gt_idx = ex.classify_errors(0.1)
+
+    result = [
+        (p, tidecv.TIDE._error_types[c], g)
+        for p, c, g in zip(pred_idx.tolist(), codes.tolist(), gt_idx.tolist())
+    ]
+    assert result == reference_classify(ex, 0.1)
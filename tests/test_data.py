@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test the array-backed storage of tidecv.Data and its dict compatibility layer.
+"""
+
+import numpy as np
+import pytest
+import tidecv
+
+
+@pytest.fixture
+def data():
+    data = tidecv.Data("test_data")
+    data.add_detection(0, 1, 0.9, box=[10, 10, 50, 50])
+    data.add_detection(1, 2, 0.8, box=[100, 100, 30, 30])
+    data.add_detection(0, 2, 0.7, box=[20, 20, 40, 40])
+    data.add_ignore_region(1, 3)
+    data.add_image(5, "empty.jpg")
+    return data
+
+
+def test_get_returns_array_views(data):
+    """get() should give the columns of one image, in the order they were added."""
+    anns = data.get(0)
+
+    assert len(anns) == 2
+    assert anns.ids.tolist() == [0, 2]
+    assert anns.classes.tolist() == [1, 2]
+    assert anns.scores.tolist() == pytest.approx([0.9, 0.7])
+    assert anns.boxes.shape == (2, 4)
+    assert anns.boxes[1].tolist() == [20, 20, 40, 40]
+    assert not anns.ignore.any()
+
+    # These are slices of the index, not copies
+    assert anns.boxes.base is not None
+
+
+def test_get_missing_image(data):
+    """Images without annotations give an empty view."""
+    assert len(data.get(5)) == 0
+    assert len(data.get(123)) == 0
+    assert list(data.get(123)) == []
+
+
+def test_annotation_dicts(data):
+    """The dict API should still be available and keep its identity across calls."""
+    anns = list(data.get(1))
+
+    assert [x["_id"] for x in anns] == [1, 3]
+    assert anns[0] == {
+        "_id": 1,
+        "score": 0.8,
+        "image": 1,
+        "class": 2,
+        "bbox": [100, 100, 30, 30],
+        "mask": None,
+        "ignore": False,
+    }
+    assert anns[1]["ignore"] and anns[1]["bbox"] is None
+
+    assert data.annotations[1] is anns[0]
+    assert data.get(1)[0] is anns[0]
+
+
+def test_images(data):
+    """Registered images are kept even if they have no annotations."""
+    assert data.image_ids == [0, 1, 5]
+    assert data.images[0] == {"name": "Image 0", "anns": [0, 2]}
+    assert data.images[5] == {"name": "empty.jpg", "anns": []}
+
+
+def test_index_updates_after_add(data):
+    """Adding an annotation after a lookup should show up in the next lookup."""
+    assert len(data.get(0)) == 2
+    data.add_detection(0, 1, 0.5, box=[0, 0, 5, 5])
+
+    anns = data.get(0)
+    assert anns.ids.tolist() == [0, 2, 4]
+    assert data.annotations[4]["score"] == 0.5
+
+
+def test_growing_many_annotations():
+    """The columns should grow past their initial capacity without losing data."""
+    data = tidecv.Data("many")
+    for i in range(1000):
+        data.add_detection(i % 7, i % 3, i / 1000, box=[i, i, i + 1, i + 1])
+
+    anns = data.get(3)
+    assert anns.ids.tolist() == list(range(3, 1000, 7))
+    assert np.array_equal(anns.boxes[:, 0], anns.ids.astype(float))
+
+
+def test_ignored_classes():
+    """Whole-image ignore regions ignore their class unless that class has ground truth."""
+    data = tidecv.Data("gt")
+    data.add_ground_truth(0, 1, box=[0, 0, 10, 10])
+    data.add_ignore_region(0, 1)
+    data.add_ignore_region(0, 2)
+    data.add_ignore_region(0, 3, box=[0, 0, 5, 5])
+
+    assert data._get_ignored_classes(0) == {2}
+
+
+def test_bulk_matches_one_by_one():
+    """Bulk ingestion should give exactly the same data as adding annotations one at a time."""
+    rng = np.random.default_rng(0)
+    num_dets = 200
+    image_ids = rng.integers(0, 20, num_dets)
+    class_ids = rng.integers(1, 5, num_dets)
+    scores = rng.random(num_dets)
+    boxes = rng.uniform(0, 100, (num_dets, 4))
+    boxes[:, 2:] += boxes[:, :2]
+
+    bulk = tidecv.Data("bulk")
+    bulk.add_detections_bulk(image_ids, class_ids, scores, boxes)
+
+    single = tidecv.Data("single")
+    for i in range(num_dets):
+        single.add_detection(
+            int(image_ids[i]), int(class_ids[i]), scores[i], box=boxes[i].tolist()
+        )
+
+    assert bulk.annotations == single.annotations
+    assert bulk.image_ids == single.image_ids
+    assert bulk.classes == single.classes
+
+    gt = tidecv.Data("gt")
+    gt.add_ground_truths_bulk(image_ids[::2], class_ids[::2], boxes[::2] + 1)
+
+    bulk_run = tidecv.TIDE().evaluate(gt, bulk)
+    single_run = tidecv.TIDE().evaluate(gt, single)
+    assert bulk_run.ap == single_run.ap
+    assert len(bulk_run.errors) == len(single_run.errors)
+
+
+def test_bulk_mixed_with_single():
+    """Bulk and single adds can be mixed and keep their ids in order."""
+    data = tidecv.Data("mixed")
+    data.add_ground_truth(3, 1, box=[0, 0, 10, 10])
+    data.add_ground_truths_bulk([3, 4], [2, 1], [[0, 0, 5, 5], [1, 1, 6, 6]])
+    data.add_ground_truth(4, 7, box=[2, 2, 3, 3])
+
+    assert data.get(3).ids.tolist() == [0, 1]
+    assert data.get(4).ids.tolist() == [2, 3]
+    assert data.annotations[1]["score"] == 1
+    assert data.classes == {1: "Class 1", 2: "Class 2", 7: "Class 7"}
+
+
+def test_bulk_length_mismatch():
+    """Inputs of different lengths should be rejected."""
+    data = tidecv.Data("bad")
+    with pytest.raises(ValueError):
+        data.add_detections_bulk([0, 1], [1, 1], [0.5], [[0, 0, 1, 1], [0, 0, 1, 1]])
+
+
+def test_gt_index_is_cached_until_data_changes():
+    """The gt index is built once, and rebuilt after annotations are added."""
+    data = tidecv.Data("gt")
+    data.add_ground_truth(0, 1, box=[0, 0, 10, 10])
+    data.add_ignore_region(0, 2)
+    data.add_ignore_region(1, 3, box=[0, 0, 5, 5])
+
+    index = data.get_gt_index()
+    assert data.get_gt_index() is index
+    assert index.get(0).ignored_classes == data._get_ignored_classes(0) == {2}
+    assert index.get(1).ignored_classes == set()
+    assert len(index.get(1).gt) == 0 and len(index.get(1).ignore_regions) == 1
+
+    data.add_ground_truths_bulk([0], [2], [[5, 5, 10, 10]])
+    new_index = data.get_gt_index()
+
+    assert new_index is not index
+    assert new_index.get(0).classes.tolist() == [1, 2]
+    assert new_index.get(0).ignored_classes == set()
+
+
+def test_images_write_through(data):
+    """Data.images is one mapping over the data, so names set through it stick."""
+    assert data.images is data.images
+
+    data.images[0]["name"] = "renamed.jpg"
+    assert data.images[0]["name"] == "renamed.jpg"
+    data.add_detection(0, 1, 0.5, box=[0, 0, 5, 5])
+    assert data.images[0] == {"name": "renamed.jpg", "anns": [0, 2, 4]}
+
+    with pytest.raises(TypeError):
+        data.images[0]["anns"] = []
+
+
+def test_images_unknown_id(data):
+    """Like a defaultdict, looking up an unknown image registers it without a name."""
+    assert 7 not in data.images
+    assert data.images.get(7) is None
+
+    assert data.images[7] == {"name": None, "anns": []}
+    assert 7 in data.images and data.image_ids == [0, 1, 5, 7]
+
+    # Adding an annotation still gives it a default name
+    data.add_detection(7, 1, 0.5, box=[0, 0, 5, 5])
+    assert data.images[7]["name"] == "Image 7"
+
+
+def test_view_indexing(data):
+    """Indexing a view with an array gives a view of those annotations, an int gives the dict."""
+    anns = data.get(1)
+    gt = anns[~anns.ignore]
+
+    assert isinstance(gt, tidecv.data.AnnotationView)
+    assert gt.ids.tolist() == [1] and gt.masks == [None]
+    assert gt[0] is data.annotations[1]
+
+    dicts = [{"_id": 7, "class": 2, "score": 0.5, "bbox": [0, 0, 5, 5], "mask": None}]
+    view = tidecv.data.AnnotationView.from_list(dicts)
+    assert view.classes.tolist() == [2] and view.boxes.tolist() == [[0, 0, 5, 5]]
+    assert list(view[np.array([0])]) == dicts
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test that images without gt or without predictions give the same results in bulk as one at a time.
+"""
+
+import random
+
+import pytest
+import tidecv
+from tidecv.quantify import TIDERun
+
+
+class BulkRun(TIDERun):
+    """Evaluates even a single empty image in bulk."""
+
+    _min_bulk_images = 1
+
+
+class PerImageRun(TIDERun):
+    """Evaluates the empty images one by one, like every other image."""
+
+    def _eval_empty_images(self, images):
+        for image in images:
+            self._eval_image_id(image)
+
+
+def make_sparse(seed, num_images=100):
+    rng = random.Random(seed)
+    gt, preds = tidecv.Data("gt"), tidecv.Data("preds")
+
+    for image in range(num_images):
+        kind = rng.random()
+
+        for _ in range(rng.randint(1, 3) if kind < 0.5 else 0):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            gt.add_ground_truth(image, rng.randint(1, 4), [x, y, x + 20, y + 20])
+        if kind < 0.1:
+            gt.add_ignore_region(image, rng.randint(1, 4), [0, 0, 10, 10])
+
+        for _ in range(rng.randint(1, 4) if 0.3 < kind < 0.8 else 0):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            # Rounded scores give ties between images
+            preds.add_detection(image, rng.randint(1, 4), round(rng.random(), 1), [x, y, x + 20, y + 20])
+
+        if kind >= 0.8:
+            gt.add_image(image, f"{image}.jpg")
+
+    # A long run of images with only predictions
+    for image in range(num_images, num_images + 20):
+        preds.add_detection(image, rng.randint(1, 4), round(rng.random(), 1), [0, 0, 10, 10])
+
+    return gt, preds
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("run_errors", [True, False])
+def test_empty_images_match_per_image(seed, run_errors):
+    gt, preds = make_sparse(seed)
+    args = (gt, preds, 0.5, 0.1, tidecv.TIDE.BOX, 100, run_errors)
+
+    expected = PerImageRun(*args)
+
+    for bulk in [BulkRun(*args), TIDERun(*args)]:
+        assert bulk.ap == expected.ap
+        assert bulk.error_table.tobytes() == expected.error_table.tobytes()
+        assert bulk.false_negatives == expected.false_negatives
+
+        assert list(bulk.ap_data.objs) == list(expected.ap_data.objs)
+        for _cls, obj in bulk.ap_data.objs.items():
+            other = expected.ap_data.objs[_cls]
+
+            assert list(obj.data_points.items()) == list(other.data_points.items())
+            assert obj.false_negatives == other.false_negatives
+            assert obj.num_gt_positives == other.num_gt_positives
+
+
+def test_bulk_points_have_their_own_info():
+    gt, preds = make_sparse(0)
+    run = BulkRun(gt, preds, 0.5, 0.1, tidecv.TIDE.BOX, 100, True)
+
+    infos = [info for obj in run.ap_data.objs.values() for _, _, info in obj.data_points.values()]
+    assert len({id(info) for info in infos}) == len(infos)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test that TIDE memoizes the main and special errors of its runs until they're evaluated again.
+"""
+
+import pytest
+import tidecv
+from tidecv.quantify import TIDERun
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Counts the calls to TIDERun.fix_main_errors and TIDERun.fix_special_errors."""
+    counts = {"main": 0, "special": 0}
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    monkeypatch.setattr(TIDERun, "fix_main_errors", counted("main", TIDERun.fix_main_errors))
+    monkeypatch.setattr(TIDERun, "fix_special_errors", counted("special", TIDERun.fix_special_errors))
+    return counts
+
+
+def test_errors_are_computed_once(calls, make_images, to_data):
+    gt, preds = to_data(make_images(0))
+    tide = tidecv.TIDE()
+    tide.evaluate(gt, preds)
+
+    main, special = tide.get_main_errors(), tide.get_special_errors()
+    assert tide.get_all_errors() == {"main": main, "special": special}
+    tide.summarize()
+    assert calls == {"main": 1, "special": 1}
+
+    # Different arguments are memoized separately
+    progressive = tide.get_main_errors(progressive=True)
+    assert tide.get_main_errors(progressive=True) == progressive
+    tide.get_main_errors(error_types=[tidecv.ClassError])
+    assert calls == {"main": 3, "special": 1}
+
+
+def test_evaluate_again_clears_memo(calls, make_images, to_data):
+    images = make_images(0)
+    gt, preds = to_data(images)
+    _, other = to_data(make_images(1))
+
+    tide = tidecv.TIDE()
+    tide.evaluate(gt, preds, name="model")
+    first = tide.get_main_errors()["model"]
+
+    tide.evaluate(gt, other, name="model")
+    second = tide.get_main_errors()["model"]
+    assert calls["main"] == 2
+
+    expected = tidecv.TIDE().evaluate(gt, other, name="model").fix_main_errors()
+    assert second == {error.short_name: value for error, value in expected.items()}
+    assert second != first
+
+
+def test_stream_is_not_memoized(make_images, to_data):
+    images = make_images(2)
+    tide = tidecv.TIDE()
+    stream = tide.stream("model")
+
+    stream.add(*images[0])
+    before = tide.get_main_errors()["model"]
+    for image in images[1:]:
+        stream.add(*image)
+
+    gt, preds = to_data(images)
+    expected = tidecv.TIDE().evaluate(gt, preds, name="model").fix_main_errors()
+    assert tide.get_main_errors()["model"] == {
+        error.short_name: value for error, value in expected.items()
+    }
+    assert tide.get_main_errors()["model"] != before
+
+
+def test_changing_the_result_keeps_memo(make_images, to_data):
+    """Every call gets its own copy of the memoized errors."""
+    gt, preds = to_data(make_images(0))
+    tide = tidecv.TIDE()
+    tide.evaluate(gt, preds)
+
+    main = tide.get_main_errors()["preds"]
+    special = tide.get_special_errors()["preds"]
+    expected_main, expected_special = dict(main), dict(special)
+
+    main.clear()
+    special["FalsePos"] = -1
+
+    assert tide.get_main_errors()["preds"] == expected_main
+    assert tide.get_all_errors()["special"]["preds"] == expected_special
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test that the error table and the Error views on top of it describe the same errors.
+"""
+
+import numpy as np
+import pytest
+import tidecv
+from tidecv.errors.error import FIX_GT, FIX_REMOVE, FIX_TRUE
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_error_views_match_table(seed, make_images, to_data):
+    gt, preds = to_data(make_images(seed, num_images=40))
+    run = tidecv.TIDE().evaluate(gt, preds)
+    table = run.error_table
+
+    assert len(run.errors) == len(table)
+    assert np.array_equal(
+        np.bincount(table["type"], minlength=len(tidecv.TIDE._error_types)),
+        [len(run.error_dict[t]) for t in tidecv.TIDE._error_types],
+    )
+
+    for error, row in zip(run.errors, table):
+        assert tidecv.TIDE._error_types[row["type"]] is type(error)
+
+        if row["pred"] >= 0:
+            assert error.pred["_id"] == row["pred"]
+            assert error.pred["class"] == row["class"]
+        if isinstance(error, tidecv.ClassError):
+            assert row["fixed_class"] == error.gt["class"]
+
+        if row["fixed"] == FIX_GT:
+            assert isinstance(error, tidecv.MissedError)
+            assert error.unfix() is None
+            assert error.fix() == (row["class"], -1)
+        elif row["fixed"] == FIX_REMOVE:
+            assert error.fix() is None
+        else:
+            assert row["fixed"] == FIX_TRUE
+            assert error.fixed[0] == row["fixed_class"]
+            assert error.fixed[1][1]
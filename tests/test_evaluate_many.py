@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test that evaluating many sets of predictions against one gt matches evaluating them one by one.
+"""
+
+import pytest
+import tidecv
+
+
+@pytest.fixture
+def models(make_images, to_data):
+    images = make_images(0, num_images=40)
+    gt, _ = to_data(images)
+    return gt, [to_data(make_images(seed, num_images=40))[1] for seed in range(1, 5)]
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_evaluate_many_matches_evaluate(models, workers):
+    gt, preds = models
+    names = [f"model_{i}" for i in range(len(preds))]
+
+    tide = tidecv.TIDE()
+    runs = tide.evaluate_many(gt, preds, names=names, workers=workers)
+
+    assert sorted(tide.runs) == names
+    for run, predictions, name in zip(runs, preds, names):
+        expected = tidecv.TIDE().evaluate(gt, predictions)
+
+        assert tide.runs[name] is run
+        assert run.ap == expected.ap
+        assert run.error_table.tobytes() == expected.error_table.tobytes()
+
+
+def test_evaluate_many_needs_a_name_per_model(models):
+    gt, preds = models
+
+    with pytest.raises(ValueError):
+        tidecv.TIDE().evaluate_many(gt, preds, names=["only_one"])
+
+
+def test_gt_index_splits_images():
+    gt = tidecv.Data("gt")
+    gt.add_ground_truth(0, 1, [0, 0, 10, 10])
+    gt.add_ground_truth(0, 2, [5, 5, 10, 10])
+    gt.add_ground_truth(0, 1, [20, 20, 10, 10])
+    gt.add_ignore_region(0, 3)
+
+    index = tidecv.GTIndex(gt)
+    image = index.get(0)
+
+    assert image.classes.tolist() == [1, 2, 1]
+    assert image.boxes.shape == (3, 4)
+    assert len(image.ignore_regions) == 1
+    assert image.ignored_classes == {3}
+    assert image.positives == {1: 2, 2: 1}
+    assert len(index.get(123)) == 0
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test that evaluating a range of thresholds gives the same results as separate evaluations.
+"""
+
+import gc
+
+import pytest
+import tidecv
+from tidecv.quantify import TIDEExample
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize(
+    "thresholds", [tidecv.TIDE.COCO_THRESHOLDS, tidecv.TIDE.VOL_THRESHOLDS]
+)
+def test_evaluate_range_matches_single_runs(seed, thresholds, make_data):
+    """Every threshold run in a range should equal a standalone run at that threshold."""
+    ground_truths, predictions = make_data(seed)
+
+    range_tide = tidecv.TIDE()
+    range_tide.evaluate_range(ground_truths, predictions, thresholds=thresholds)
+    range_runs = range_tide.run_thresholds[predictions.name]
+
+    assert len(range_runs) == len(thresholds)
+
+    for thresh, range_run in zip(thresholds, range_runs):
+        single_run = tidecv.TIDE().evaluate(
+            ground_truths, predictions, pos_threshold=thresh
+        )
+        assert range_run.pos_thresh == thresh
+        assert range_run.ap == pytest.approx(single_run.ap)
+
+    # The error run at pos_threshold should be the same as a regular evaluation
+    error_run = range_tide.runs[predictions.name]
+    single_run = tidecv.TIDE().evaluate(ground_truths, predictions)
+
+    assert error_run.ap == pytest.approx(single_run.ap)
+    assert sorted(type(e).__name__ for e in error_run.errors) == sorted(
+        type(e).__name__ for e in single_run.errors
+    )
+    assert error_run.fix_main_errors() == pytest.approx(single_run.fix_main_errors())
+
+
+def test_runs_dont_keep_examples(make_data):
+    """The examples shared between the thresholds are only needed while evaluating."""
+    ground_truths, predictions = make_data(0)
+
+    tide = tidecv.TIDE()
+    tide.evaluate_range(ground_truths, predictions)
+    gc.collect()
+
+    assert all(run.examples is None for run in tide.run_thresholds[predictions.name])
+    assert not any(isinstance(x, TIDEExample) for x in gc.get_objects())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test that the incremental error fixing gives the same dAPs as rebuilding the AP data with fix_errors.
+"""
+
+import pytest
+import tidecv
+from tidecv.errors.main_errors import FalseNegativeError, FalsePositiveError
+
+# Coarse scores give lots of ties, which is where ordering matters
+DATA_ARGS = {"num_images": 25, "num_classes": 4, "ties": True}
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("qual", [None] + tidecv.AREA)
+def test_main_errors_match_rebuild(seed, qual, make_data):
+    """Each main error dAP should be the same as fixing that error type with fix_errors."""
+    ground_truths, predictions = make_data(seed, **DATA_ARGS)
+    run = tidecv.TIDE().evaluate(ground_truths, predictions)
+
+    main_errors = run.fix_main_errors(qual=qual)
+    qual = tidecv.Qualifier("", None) if qual is None else qual
+
+    for error_type in tidecv.TIDE._error_types:
+        rebuilt = run.fix_errors(qual._make_error_func(error_type)).get_mAP()
+        assert main_errors[error_type] == pytest.approx(max(rebuilt - run.ap, 0))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_special_errors_match_rebuild(seed, make_data):
+    """The special error dAPs should be the same as the transforms applied with fix_errors."""
+    ground_truths, predictions = make_data(seed, **DATA_ARGS)
+    run = tidecv.TIDE().evaluate(ground_truths, predictions)
+
+    special_errors = run.fix_special_errors()
+
+    false_pos = run.fix_errors(transform=FalsePositiveError.fix).get_mAP() - run.ap
+    false_neg = run.fix_errors(false_neg_dict=run.false_negatives).get_mAP() - run.ap
+
+    assert special_errors[FalsePositiveError] == pytest.approx(false_pos)
+    assert special_errors[FalseNegativeError] == pytest.approx(false_neg)
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("qual", [None] + tidecv.AREA)
+def test_progressive_errors_match_rebuild(seed, qual, make_data):
+    """Each progressive dAP should be the same as fixing that error type and all the ones before it at once."""
+    ground_truths, predictions = make_data(seed, **DATA_ARGS)
+    run = tidecv.TIDE().evaluate(ground_truths, predictions)
+
+    progressive = run.fix_main_errors(progressive=True, qual=qual)
+    qual = tidecv.Qualifier("", None) if qual is None else qual
+
+    last_ap = run.ap
+    conditions = []
+    for error_type in tidecv.TIDE._error_types:
+        conditions.append(qual._make_error_func(error_type))
+        rebuilt = run.fix_errors(lambda x: any(f(x) for f in conditions)).get_mAP()
+
+        assert progressive[error_type] == pytest.approx(max(rebuilt - last_ap, 0))
+        last_ap = rebuilt
+
+
+def test_progressive_leaves_errors_untouched(make_data):
+    ground_truths, predictions = make_data(0, **DATA_ARGS)
+    run = tidecv.TIDE().evaluate(ground_truths, predictions)
+
+    first = run.fix_main_errors(progressive=True)
+    assert not any(error.disabled for error in run.errors)
+    assert run.fix_main_errors(progressive=True) == first
+    assert run.fix_main_errors() == tidecv.TIDE().evaluate(ground_truths, predictions).fix_main_errors()
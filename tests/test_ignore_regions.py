@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test that detections falling inside of ignore (crowd) regions are ignored.
+"""
+
+import numpy as np
+import pytest
+import tidecv
+from tidecv import mask as mask_utils
+
+
+def make_data(region_class, region_box=None, region_mask=None, with_stray=True):
+    """One image with a matched detection, plus a stray detection in the corner if with_stray."""
+    ground_truths = tidecv.Data("gt")
+    predictions = tidecv.Data("preds")
+
+    ground_truths.add_ground_truth(0, 1, box=[10, 10, 40, 40], mask=square(10, 10, 30))
+    predictions.add_detection(0, 1, 0.5, box=[10, 10, 40, 40], mask=square(10, 10, 30))
+
+    if with_stray:
+        predictions.add_detection(0, 1, 0.9, box=[60, 60, 70, 70], mask=square(60, 60, 10))
+    if region_class is not None:
+        ground_truths.add_ignore_region(0, region_class, box=region_box, mask=region_mask)
+
+    return ground_truths, predictions
+
+
+def square(x, y, size):
+    return [[x, y, x + size, y, x + size, y + size, x, y + size]]
+
+
+@pytest.mark.parametrize("mode", [tidecv.TIDE.BOX, tidecv.TIDE.MASK])
+@pytest.mark.parametrize("region_class,ignored", [(1, True), (-1, True), (2, False)])
+def test_region_ignores_detections(mode, region_class, ignored):
+    """A stray detection inside a region of its class (or -1) shouldn't count against the AP."""
+    region_box = [50, 50, 100, 100]
+    region_mask = square(50, 50, 50)
+    run = tidecv.TIDE().evaluate(
+        *make_data(region_class, region_box, region_mask), mode=mode
+    )
+
+    expected = tidecv.TIDE().evaluate(*make_data(None, with_stray=not ignored), mode=mode)
+    assert run.ap == pytest.approx(expected.ap)
+
+
+@pytest.mark.parametrize("mode", [tidecv.TIDE.BOX, tidecv.TIDE.MASK])
+def test_region_uses_crowd_iou(mode):
+    """Overlap is measured over the detection's area, so a small region partly covering it is not enough."""
+    run = tidecv.TIDE().evaluate(
+        *make_data(1, [65, 60, 100, 100], square(65, 60, 35)), mode=mode
+    )
+    stray = tidecv.TIDE().evaluate(*make_data(None), mode=mode)
+
+    # Half of the detection is inside the region, which is not more than the 0.5 threshold
+    assert run.ap == pytest.approx(stray.ap)
+
+
+def test_whole_image_region():
+    """A region without a box or mask covers the whole image."""
+    run = tidecv.TIDE().evaluate(*make_data(1))
+    expected = tidecv.TIDE().evaluate(*make_data(None, with_stray=False))
+    assert run.ap == pytest.approx(expected.ap)
+
+
+def test_region_without_annotation_for_mode():
+    """A region with only a mask is skipped when evaluating boxes."""
+    run = tidecv.TIDE().evaluate(
+        *make_data(1, region_mask=square(50, 50, 50)), mode=tidecv.TIDE.BOX
+    )
+    stray = tidecv.TIDE().evaluate(*make_data(None))
+    assert run.ap == pytest.approx(stray.ap)
+
+
+def test_crowd_iou_matrix():
+    """The crowd IoU matrix covers every detection and region at once."""
+    dets = [square(0, 0, 10), square(5, 0, 10), square(50, 50, 4)]
+    regions = [square(0, 0, 10), square(0, 0, 60)]
+
+    iou = mask_utils.iou(dets, regions, [True, True])
+    assert np.allclose(iou, [[1.0, 1.0], [0.5, 1.0], [0.0, 1.0]])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test the NumPy mask utilities against dense mask computations.
+"""
+
+import random
+
+import numpy as np
+import pytest
+import tidecv
+from tidecv import mask as mask_utils
+
+
+def random_masks(rng, num, h, w):
+    return [(rng.random((h, w)) < rng.random()).astype(np.uint8) for _ in range(num)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_encode_decode_roundtrip(seed):
+    """Decoding an encoded mask should give back the same mask, from both the string and list counts."""
+    rng = np.random.default_rng(seed)
+    h, w = rng.integers(1, 40, size=2)
+
+    for mask in random_masks(rng, 5, h, w):
+        rle = mask_utils.encode(mask)
+        assert np.array_equal(mask_utils.decode(rle), mask)
+        assert mask_utils.area(rle) == mask.sum()
+
+        counts = mask_utils._string_to_counts(rle["counts"])
+        assert mask_utils._counts_to_string(counts) == rle["counts"]
+        assert np.array_equal(mask_utils.decode({"size": [h, w], "counts": counts.tolist()}), mask)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_iou_matches_dense(seed):
+    """The compressed IoU should be the same as the IoU of the decoded masks, crowds included."""
+    rng = np.random.default_rng(seed)
+    h, w = rng.integers(1, 40, size=2)
+    dets = random_masks(rng, rng.integers(0, 6), h, w)
+    gts = random_masks(rng, rng.integers(0, 6), h, w)
+    iscrowd = rng.random(len(gts)) < 0.5
+
+    expected = np.zeros((len(dets), len(gts)))
+    for i, det in enumerate(dets):
+        for j, gt in enumerate(gts):
+            union = det.sum() if iscrowd[j] else (det | gt).sum()
+            expected[i, j] = (det & gt).sum() / union if union > 0 else 0
+
+    result = mask_utils.iou(
+        [mask_utils.encode(x) for x in dets], [mask_utils.encode(x) for x in gts], iscrowd
+    )
+    assert result.shape == (len(dets), len(gts))
+    assert np.allclose(result, expected)
+
+
+def test_polygon_rectangle():
+    """A rectangle polygon covers exactly the pixels inside of it."""
+    rle = mask_utils.from_polygons([[2, 3, 12, 3, 12, 8, 2, 8]], 20, 20)
+
+    expected = np.zeros((20, 20), dtype=np.uint8)
+    expected[3:8, 2:12] = 1
+    assert np.array_equal(mask_utils.decode(rle), expected)
+
+
+def test_merge_is_union():
+    """Merging two overlapping squares counts the overlap once."""
+    merged = mask_utils.merge([[[0, 0, 5, 0, 5, 5, 0, 5]], [[3, 3, 8, 3, 8, 8, 3, 8]]])
+    assert mask_utils.area(merged) == 25 + 25 - 4
+
+
+def test_mismatched_sizes():
+    with pytest.raises(ValueError):
+        mask_utils.iou([mask_utils.encode(np.zeros((4, 4)))], [mask_utils.encode(np.zeros((5, 4)))])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_mask_mode_matches_box_mode(seed):
+    """Rectangle polygons on integer boxes inside the image should evaluate exactly like the boxes."""
+    rng = random.Random(seed)
+    ground_truths = tidecv.Data("gt")
+    predictions = tidecv.Data("preds")
+
+    def rect(x, y, w, h):
+        box = [x, y, x + w, y + h]
+        return box, [[x, y, x + w, y, x + w, y + h, x, y + h]]
+
+    for image_id in range(10):
+        boxes = []
+        for _ in range(rng.randint(1, 5)):
+            box, poly = rect(rng.randint(4, 80), rng.randint(4, 80), rng.randint(4, 30), rng.randint(4, 30))
+            class_id = rng.randint(1, 3)
+            boxes.append((class_id, box))
+            ground_truths.add_ground_truth(image_id, class_id, box=box, mask=poly)
+
+        for _ in range(rng.randint(1, 8)):
+            class_id, (x1, y1, x2, y2) = rng.choice(boxes)
+            box, poly = rect(x1 + rng.randint(-4, 4), y1 + rng.randint(-4, 4), x2 - x1, y2 - y1)
+            predictions.add_detection(image_id, class_id, rng.random(), box=box, mask=poly)
+
+    box_run = tidecv.TIDE().evaluate(ground_truths, predictions, mode=tidecv.TIDE.BOX)
+    mask_run = tidecv.TIDE().evaluate(ground_truths, predictions, mode=tidecv.TIDE.MASK)
+
+    assert mask_run.ap == pytest.approx(box_run.ap)
+    # The masks are read through the columns, without creating the annotation dicts
+    assert len(ground_truths._annotations) == 0 and len(predictions._annotations) == 0
+
+    assert sorted(type(x).__name__ for x in mask_run.errors) == sorted(
+        type(x).__name__ for x in box_run.errors
+    )
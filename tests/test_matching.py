@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the sparse greedy matcher against the dense argmax loop it replaced.
+"""
+
+import numpy as np
+import pytest
+import tidecv
+from tidecv.matching import best_per_group, greedy_match, greedy_match_thresholds
+
+
+def reference_match(iou, pred_classes, gt_classes, thresh):
+    """The original matching loop over the class-masked IoU matrix."""
+    iou_buffer = iou * (pred_classes[:, None] == gt_classes[None, :])
+    pred_matches = np.full(iou.shape[0], -1)
+    gt_matches = np.full(iou.shape[1], -1)
+
+    for pred_idx in range(iou.shape[0]):
+        gt_idx = np.argmax(iou_buffer[pred_idx, :])
+        if iou_buffer[pred_idx, gt_idx] >= thresh:
+            pred_matches[pred_idx] = gt_idx
+            gt_matches[gt_idx] = pred_idx
+            iou_buffer[:, gt_idx] = 0
+
+    return pred_matches, gt_matches
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("thresh", [0.1, 0.5, 0.75])
+def test_greedy_match_matches_reference(seed, thresh):
+    """Rounded IoUs give lots of ties, which should be broken the same way argmax does."""
+    rng = np.random.default_rng(seed)
+    num_preds, num_gt = rng.integers(1, 30), rng.integers(1, 10)
+
+    iou = np.round(rng.random((num_preds, num_gt)) * rng.random((num_preds, 1)), 1)
+    pred_classes = rng.integers(1, 4, num_preds)
+    gt_classes = rng.integers(1, 4, num_gt)
+
+    result = greedy_match(iou, pred_classes, gt_classes, thresh)
+    expected = reference_match(iou, pred_classes, gt_classes, thresh)
+
+    assert np.array_equal(result[0], expected[0])
+    assert np.array_equal(result[1], expected[1])
+
+
+def test_greedy_match_skips_taken_gt():
+    """A lower scored prediction falls back to its next best gt when its best one is taken."""
+    iou = np.array([[0.9, 0.6], [0.8, 0.7]])
+    classes = np.array([1, 1])
+
+    pred_matches, gt_matches = greedy_match(iou, classes, classes, 0.5)
+    assert pred_matches.tolist() == [0, 1]
+    assert gt_matches.tolist() == [0, 1]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("thresholds", [tidecv.TIDE.COCO_THRESHOLDS, tidecv.TIDE.VOL_THRESHOLDS])
+def test_threshold_kernel_matches_single(seed, thresholds):
+    """Every row of the multi-threshold kernel should be the same as matching at that threshold alone."""
+    rng = np.random.default_rng(seed)
+    num_preds, num_gt = rng.integers(1, 30), rng.integers(1, 10)
+
+    iou = np.round(rng.random((num_preds, num_gt)), 2)
+    pred_classes = rng.integers(1, 3, num_preds)
+    gt_classes = rng.integers(1, 3, num_gt)
+
+    pred_matches, gt_used = greedy_match_thresholds(iou, pred_classes, gt_classes, thresholds)
+    assert pred_matches.shape == (len(thresholds), num_preds)
+    assert gt_used.shape == (len(thresholds), num_gt)
+
+    for t, thresh in enumerate(thresholds):
+        expected_pred, expected_gt = greedy_match(iou, pred_classes, gt_classes, thresh)
+        assert np.array_equal(pred_matches[t], expected_pred)
+        assert np.array_equal(gt_used[t], expected_gt >= 0)
+
+
+def test_best_per_group_ties_go_to_earliest():
+    groups = np.array([2, 0, 2, 0, 1, 2])
+    scores = np.array([0.5, 0.3, 0.9, 0.3, 0.1, 0.9])
+
+    assert best_per_group(groups, scores).tolist() == [1, 4, 2]
+    assert best_per_group(groups[:0], scores[:0]).tolist() == []
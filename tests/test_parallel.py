@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Test that evaluating images in worker processes gives the same results as evaluating them serially.
+"""
+
+import pytest
+import tidecv
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_matches_serial(workers, make_data):
+    """The merged results of the workers should equal a serial run, in the same order."""
+    ground_truths, predictions = make_data(workers, num_images=40)
+
+    serial = tidecv.TIDE().evaluate(ground_truths, predictions)
+    parallel = tidecv.TIDE().evaluate(ground_truths, predictions, workers=workers)
+
+    assert parallel.ap == serial.ap
+    assert [(type(e), e.get_id()) for e in parallel.errors] == [
+        (type(e), e.get_id()) for e in serial.errors
+    ]
+    assert parallel.fix_main_errors() == serial.fix_main_errors()
+    assert parallel.fix_special_errors() == serial.fix_special_errors()
+
+    for error_type, errors in serial.error_dict.items():
+        assert len(parallel.error_dict[error_type]) == len(errors)
+    for _cls, false_negatives in serial.false_negatives.items():
+        assert [x["_id"] for x in parallel.false_negatives[_cls]] == [
+            x["_id"] for x in false_negatives
+        ]
+
+
+@pytest.mark.parametrize("num_images", [0, 1])
+def test_parallel_with_too_few_images(num_images, make_data):
+    """With fewer images than it takes to split them up, the images are evaluated serially."""
+    ground_truths, predictions = make_data(0, num_images=num_images)
+
+    serial = tidecv.TIDE().evaluate(ground_truths, predictions)
+    parallel = tidecv.TIDE().evaluate(ground_truths, predictions, workers=2)
+
+    assert parallel.ap == serial.ap
+    assert parallel.error_table.tobytes() == serial.error_table.tobytes()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test that qualifiers work with the vectorized predicates and give the same results as the per-annotation lambdas.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pytest
+import tidecv
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_bitmask_matches_lambdas(seed, make_data):
+    gt, preds = make_data(seed, num_images=30)
+    quals = tidecv.AREA + tidecv.ASPECT_RATIO
+
+    for data in [gt, preds]:
+        bitmask = tidecv.make_bitmask(data, quals)
+
+        for bit, q in enumerate(quals):
+            # Ignore regions never qualify
+            expected = [not x["ignore"] and q.test(x) for x in data.annotations]
+            assert ((bitmask >> np.uint64(bit)) & np.uint64(1)).astype(bool).tolist() == expected
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_add_qualifiers_matches_lambdas(seed, make_data):
+    gt, preds = make_data(seed, num_images=30)
+    quals = tidecv.AREA + tidecv.ASPECT_RATIO
+
+    tide = tidecv.TIDE()
+    tide.evaluate_range(gt, preds)
+    tide.add_qualifiers(*quals)
+
+    assert list(tide.qualifiers) == [q.name for q in quals]
+
+    for run in tide.run_thresholds["preds"]:
+        for q in quals:
+            # Filter a copy of the AP data with sets of the ids that pass the lambda, like it used to
+            pred_keep, gt_keep = defaultdict(set), defaultdict(set)
+            for pred in preds.annotations:
+                if q.test(pred):
+                    pred_keep[pred["class"]].add(pred["_id"])
+            for truth in gt.annotations:
+                if not truth["ignore"] and q.test(truth):
+                    gt_keep[truth["class"]].add(truth["_id"])
+
+            expected_data = run.ap_data.apply_qualifier(pred_keep, gt_keep)
+            expected = expected_data.get_mAP()
+            assert run.qualifiers[q.name] == expected
+            assert run.get_qualified_mAP(tidecv.Qualifier(q.name, q.test)) == expected
+
+            # The slow path still gives the filtered AP data
+            qualified = run.apply_qualifier(tidecv.Qualifier(q.name, q.test))
+            assert isinstance(qualified, tidecv.ClassedAPDataObject)
+            assert qualified.get_mAP() == expected
+            assert qualified.get_gt_positives() == expected_data.get_gt_positives()
+
+
+def test_qualifier_that_keeps_everything(make_data):
+    gt, preds = make_data(0, num_images=30)
+
+    tide = tidecv.TIDE()
+    run = tide.evaluate(gt, preds)
+    tide.add_qualifiers(tidecv.Qualifier("All", lambda x: True, lambda b: np.ones(len(b), dtype=bool)))
+
+    assert run.qualifiers["All"] == pytest.approx(run.ap)
+
+
+def test_qualifiers_without_gt(make_data):
+    _, preds = make_data(0, num_images=30)
+    quals = tidecv.AREA + tidecv.ASPECT_RATIO
+
+    tide = tidecv.TIDE()
+    run = tide.evaluate(tidecv.Data("gt"), preds)
+    tide.add_qualifiers(*quals)
+
+    for q in quals:
+        assert run.qualifiers[q.name] == 0
+        assert run.apply_qualifier(tidecv.Qualifier(q.name, q.test)).get_mAP() == 0
+
+
+def test_too_many_qualifiers(make_data):
+    gt, _ = make_data(0, num_images=30)
+
+    with pytest.raises(ValueError):
+        tidecv.make_bitmask(gt, [tidecv.Qualifier(str(i), lambda x: True) for i in range(65)])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_qualified_errors_match_fix_main_errors(seed, make_data):
+    gt, preds = make_data(seed, num_images=30)
+    quals = tidecv.AREA + tidecv.ASPECT_RATIO
+
+    tide = tidecv.TIDE()
+    run = tide.evaluate(gt, preds)
+    tide.add_qualifiers(*quals)
+
+    qualified = tide.get_qualified_errors()["preds"]
+    assert list(qualified) == [q.name for q in quals]
+
+    for q in quals:
+        # The error lambda of the qualifier, tested one error at a time
+        expected = run.fix_main_errors(qual=tidecv.Qualifier(q.name, q.test))
+        assert qualified[q.name] == {error.short_name: value for error, value in expected.items()}
+
+
+def test_qualifier_that_keeps_everything_has_all_errors(make_data):
+    gt, preds = make_data(1, num_images=30)
+
+    tide = tidecv.TIDE()
+    tide.evaluate(gt, preds)
+    tide.add_qualifiers(tidecv.Qualifier("All", lambda x: True))
+
+    assert tide.get_qualified_errors()["preds"]["All"] == tide.get_main_errors()["preds"]
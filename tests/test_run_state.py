@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test that evaluation keeps its matching state to itself instead of writing it into the shared Data.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import tidecv
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_evaluate_leaves_annotations_untouched(seed, make_images, to_data):
+    gt, preds = to_data(make_images(seed))
+    keys = {"_id", "score", "image", "class", "bbox", "mask", "ignore"}
+
+    tide = tidecv.TIDE()
+    tide.evaluate_range(gt, preds)
+
+    for annotation in gt.annotations + preds.annotations:
+        assert set(annotation) == keys
+
+
+def test_evaluate_builds_no_annotation_dicts(make_images, to_data):
+    """Evaluation reads the columns of the Data, so the compatibility dicts are never created."""
+    gt, preds = to_data(make_images(0))
+
+    tide = tidecv.TIDE()
+    tide.evaluate_range(gt, preds)
+    tide.get_all_errors()
+
+    assert len(gt._annotations) == 0 and len(preds._annotations) == 0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_repeated_runs_agree(seed, make_images, to_data):
+    gt, preds = to_data(make_images(seed))
+
+    first = tidecv.TIDE().evaluate(gt, preds, name="first")
+    second = tidecv.TIDE().evaluate(gt, preds, name="second")
+
+    assert first.ap == second.ap
+    assert first.error_table.tobytes() == second.error_table.tobytes()
+
+
+def test_concurrent_evaluate_on_shared_gt(make_images, to_data):
+    """Several models evaluated at once against the same gt should give the same results as one at a time."""
+    images = make_images(0, num_images=60)
+    gt, _ = to_data(images)
+    models = [to_data(make_images(seed, num_images=60))[1] for seed in range(1, 7)]
+
+    expected = [tidecv.TIDE().evaluate(gt, preds, name=str(i)) for i, preds in enumerate(models)]
+
+    # A fresh gt, so its lazy index and annotation dicts are built by the threads themselves
+    gt, _ = to_data(images)
+    tide = tidecv.TIDE()
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        runs = list(
+            pool.map(lambda x: tide.evaluate(gt, x[1], name=str(x[0])), enumerate(models))
+        )
+
+    assert sorted(tide.runs) == [str(i) for i in range(len(models))]
+    for run, expected_run in zip(runs, expected):
+        assert run.ap == expected_run.ap
+        assert run.error_table.tobytes() == expected_run.error_table.tobytes()
+        assert [e.get_id() for e in run.errors] == [e.get_id() for e in expected_run.errors]
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test that streaming images one at a time gives the same results as evaluating all of them at once.
+"""
+
+import numpy as np
+import pytest
+import tidecv
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_stream_matches_evaluate(seed, make_images, to_data):
+    images = make_images(seed)
+    run = tidecv.TIDE().evaluate(*to_data(images))
+
+    stream = tidecv.TIDEStream()
+    for image in images:
+        stream.add(*image)
+
+    summary = stream.summarize()
+    assert summary["ap"] == pytest.approx(run.ap)
+
+    expected_main = {k.short_name: v for k, v in run.fix_main_errors().items()}
+    expected_special = {k.short_name: v for k, v in run.fix_special_errors().items()}
+    assert summary["main"] == pytest.approx(expected_main)
+    assert summary["special"] == pytest.approx(expected_special)
+
+
+def test_summarize_midway(make_images, to_data):
+    """Summaries in the middle of the stream cover exactly the images added so far."""
+    images = make_images(0)
+    tide = tidecv.TIDE()
+    stream = tide.stream("model")
+
+    for num_added, image in enumerate(images, 1):
+        stream.add(*image)
+
+        if num_added in (1, 7, 13):
+            run = tidecv.TIDE().evaluate(*to_data(images[:num_added]))
+            assert stream.summarize()["ap"] == pytest.approx(run.ap)
+            assert tide.get_main_errors()["model"] == pytest.approx(
+                {k.short_name: v for k, v in run.fix_main_errors().items()}
+            )
+
+
+def test_stream_drops_masks():
+    """Masks aren't kept around after an image has been evaluated."""
+    stream = tidecv.TIDEStream(mode=tidecv.TIDE.MASK)
+    square = [[0, 0, 10, 0, 10, 10, 0, 10]]
+    stream.add(0, [{"class": 1, "mask": square}], [{"class": 2, "mask": square, "score": 0.5}])
+
+    assert len(stream.errors) > 0
+    assert all(error.pred["mask"] is None for error in stream.errors if hasattr(error, "pred"))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_stream_keeps_only_error_rows(seed, make_images, to_data):
+    """Only a row per annotation an error refers to is kept, and false negatives are just counted."""
+    images = make_images(seed)
+    run = tidecv.TIDE().evaluate(*to_data(images))
+
+    stream = tidecv.TIDEStream()
+    for image in images:
+        stream.add(*image)
+
+    table = stream.error_table
+    referenced = np.unique(np.concatenate([table["pred"], table["gt"], table["suppressor"]]))
+    assert sum(len(x) for x in stream._annotation_chunks) == len(referenced[referenced >= 0])
+
+    assert stream.false_negative_counts == {k: v for k, v in run.false_negative_counts.items() if v > 0}
+
+    def describe(error):
+        annotation = error.pred if hasattr(error, "pred") else error.gt
+        return type(error).__name__, annotation["image"], annotation["class"], annotation["score"], annotation["bbox"]
+
+    assert sorted(map(describe, stream.errors)) == sorted(map(describe, run.errors))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_stream_keeps_ap_data_as_arrays(seed, make_images, to_data):
+    """The AP data points are kept as arrays, and their dicts are only created on access."""
+    images = make_images(seed)
+    run = tidecv.TIDE().evaluate(*to_data(images))
+
+    stream = tidecv.TIDEStream()
+    for image in images:
+        stream.add(*image)
+    stream.summarize()
+
+    assert list(stream.ap_data.objs) == list(run.ap_data.objs)
+    for _cls, obj in stream.ap_data.objs.items():
+        assert obj._data_points is None
+
+        # The ids differ, but everything else about the data points is the same
+        expected = run.ap_data.objs[_cls]
+        assert len(obj.data_points) == len(expected.data_points)
+        assert [(score, is_true, info["iou"]) for score, is_true, info in obj.data_points.values()] == [
+            (score, is_true, info["iou"]) for score, is_true, info in expected.data_points.values()
+        ]
+        assert len(obj.false_negatives) == len(expected.false_negatives)
+        assert obj.num_gt_positives == expected.num_gt_positives
@@ -3,7 +3,8 @@
 Copyright (c) 2020 Daniel Bolya
 """
 
-from .data import Data
+from .data import Data, GTIndex, ImageGT
 from .errors.qualifiers import *
+from .iou import box_iou
 from .quantify import *
 from .quantify import TIDE
\ No newline at end of file
@@ -5,6 +5,43 @@ from collections import defaultdict
 import numpy as np
 
 
+# Recall values at which the precision is sampled, idx 0 is recall == 0.0 and idx 100 is recall == 1.00
+_RECALL_THRESHOLDS = np.array([x / 100 for x in range(100 + 1)])
+
+
+def compute_ap(is_true: np.ndarray, num_gt_positives: int) -> tuple:
+    """
+    Computes the AP of a list of detections that's already sorted descending by score,
+    where is_true says whether each detection is a true or false positive.
+    Returns the AP and the (recall, precision) curve it was integrated from.
+    """
+    # Compute the precision-recall curve. The x axis is recalls and the y axis precisions.
+    num_true = np.cumsum(is_true)
+    num_false = np.arange(1, len(is_true) + 1) - num_true
+
+    precisions = num_true / (num_true + num_false)
+    recalls = num_true / num_gt_positives
+
+    # Smooth the curve by computing [max(precisions[i:]) for i in range(len(precisions))]
+    # Basically, remove any temporary dips from the curve.
+    # At least that's what I think, idk. COCOEval did it so I do too.
+    precisions = np.maximum.accumulate(precisions[::-1])[::-1]
+
+    # Compute the integral of precision(recall) d_recall from recall=0->1 using fixed-length riemann summation with 101 bars.
+    # I realize this is weird, but all it does is find the nearest precision(x) for a given x in x_range.
+    # Basically, if the closest recall we have to 0.01 is 0.009 this sets precision(0.01) = precision(0.009).
+    # I approximate the integral this way, because that's how COCOEval does it.
+    x_range = _RECALL_THRESHOLDS
+    indices = np.searchsorted(recalls, x_range, side="left")
+    y_range = np.zeros(len(x_range))
+    in_range = indices < len(precisions)
+    y_range[in_range] = precisions[indices[in_range]]
+
+    # Finally compute the riemann sum to get our integral.
+    # avg([precision(x) for x in 0:0.01:1])
+    return y_range.sum() / len(y_range) * 100, (x_range, y_range)
+
+
 class APDataObject:
     """
     Stores all the information necessary to calculate the AP for one IoU and one class.
@@ -17,6 +54,17 @@ class APDataObject:
         self.num_gt_positives = 0
         self.curve = None
 
+        # Cached results, cleared whenever the data changes
+        self._ap = None
+        self._sorted = None
+        self._sorted_ids = None
+
+    def _clear_cache(self):
+        self._ap = None
+        self._sorted = None
+        self._sorted_ids = None
+        self.curve = None
+
     def apply_qualifier(self, kept_preds: set, kept_gts: set) -> object:
         """Makes a new data object where we remove the ids in the pred and gt lists."""
         obj = APDataObject()
@@ -32,7 +80,7 @@ class APDataObject:
                 continue
 
             if pred_id in kept_preds:
-                obj.data_points[pred_id] = self.data_points[pred_id]
+                obj.push(pred_id, score, is_true, info)
 
         # Propogate the gt
         obj.false_negatives = self.false_negatives.intersection(kept_gts)
@@ -43,88 +91,126 @@ class APDataObject:
 
     def push(self, id: int, score: float, is_true: bool, info: dict = {}):
         self.data_points[id] = (score, is_true, info)
+        self._clear_cache()
+
+    def push_many(self, ids: list, scores: list, is_true: bool, info: dict = {}):
+        """Pushes several data points at once with the same is_true. Each gets its own copy of info."""
+        self.data_points.update(
+            (_id, (score, is_true, dict(info))) for _id, score in zip(ids, scores)
+        )
+        self._clear_cache()
 
     def push_false_negative(self, id: int):
         self.false_negatives.add(id)
 
+    def push_false_negatives(self, ids: list):
+        self.false_negatives.update(ids)
+
+    def extend(self, other: "APDataObject"):
+        """Adds all the data in another data object (e.g., from a different set of images) to this one."""
+        self.data_points.update(other.data_points)
+        self.false_negatives.update(other.false_negatives)
+        self.num_gt_positives += other.num_gt_positives
+        self._clear_cache()
+
     def add_gt_positives(self, num_positives: int):
         """Call this once per image."""
         self.num_gt_positives += num_positives
+        self._clear_cache()
 
     def is_empty(self) -> bool:
         # A class is considered empty only if it has no data points AND no ground truth
         # If it has predictions but no ground truth, it should still be evaluated (with AP=0)
-        return len(self.data_points) == 0 and self.num_gt_positives == 0
+        return self._num_points() == 0 and self.num_gt_positives == 0
+
+    def _num_points(self) -> int:
+        return len(self.data_points)
 
     def get_pr_curve(self) -> tuple:
         if self.curve is None:
             self.get_ap()
         return self.curve
 
+    def _get_sorted(self) -> tuple:
+        """Returns the (scores, is_true) arrays of the data points, sorted descending by score."""
+        if self._sorted is None:
+            num_points = len(self.data_points)
+            values = self.data_points.values()
+
+            scores = np.fromiter((x[0] for x in values), dtype=np.float64, count=num_points)
+            is_true = np.fromiter((x[1] for x in values), dtype=bool, count=num_points)
+
+            # Stable, so data points with the same score stay in the order they were pushed
+            order = np.argsort(-scores, kind="stable")
+            self._sorted = (scores[order], is_true[order], order)
+
+        return self._sorted
+
+    def _get_sorted_ids(self) -> tuple:
+        """
+        Returns the (ids, matched_with) arrays of the data points in the same order as _get_sorted,
+        where matched_with is the id of the gt a true positive got matched with or -1.
+        """
+        if self._sorted_ids is None:
+            num_points = len(self.data_points)
+            order = self._get_sorted()[2]
+
+            ids = np.fromiter(self.data_points.keys(), dtype=np.int64, count=num_points)
+            matched_with = np.fromiter(
+                (x[2]["matched_with"] if x[1] else -1 for x in self.data_points.values()),
+                dtype=np.int64,
+                count=num_points,
+            )
+            self._sorted_ids = (ids[order], matched_with[order])
+
+        return self._sorted_ids
+
+    def _qualify(self, pred_mask: np.ndarray, gt_mask: np.ndarray) -> tuple:
+        """
+        Does what apply_qualifier does with boolean masks indexed by annotation id instead of sets of ids.
+        Returns the sorted is_true array of the kept data points and the number of gt positives left.
+        """
+        is_true = self._get_sorted()[1]
+        ids, matched_with = self._get_sorted_ids()
+
+        # If a true positive's gt isn't kept, both are removed. Only true positives have a gt to look up.
+        gt_removed = np.zeros_like(is_true)
+        gt_removed[is_true] = ~gt_mask[matched_with[is_true]]
+        kept = pred_mask[ids] & ~gt_removed
+
+        false_negatives = np.fromiter(
+            self.false_negatives, dtype=np.int64, count=len(self.false_negatives)
+        )
+        num_gt_removed = int(gt_removed.sum()) + int((~gt_mask[false_negatives]).sum())
+
+        return is_true[kept], self.num_gt_positives - num_gt_removed
+
+    def get_qualified_ap(self, pred_mask: np.ndarray, gt_mask: np.ndarray) -> float:
+        """The same as apply_qualifier(...).get_ap(), but without making a new data object."""
+        is_true, num_gt_positives = self._qualify(pred_mask, gt_mask)
+
+        if num_gt_positives == 0:
+            return 0
+        return compute_ap(is_true, num_gt_positives)[0]
+
     def get_ap(self) -> float:
-        """Warning: result not cached."""
+        """The result is cached until the data in this object changes."""
 
         if self.num_gt_positives == 0:
             return 0
 
-        # Sort descending by score
-        data_points = list(self.data_points.values())
-        data_points.sort(key=lambda x: -x[0])
-
-        precisions = []
-        recalls = []
-        num_true = 0
-        num_false = 0
-
-        # Compute the precision-recall curve. The x axis is recalls and the y axis precisions.
-        for datum in data_points:
-            # datum[1] is whether the detection a true or false positive
-            if datum[1]:
-                num_true += 1
-            else:
-                num_false += 1
-
-            precision = num_true / (num_true + num_false)
-            recall = num_true / self.num_gt_positives
-
-            precisions.append(precision)
-            recalls.append(recall)
-
-        # Smooth the curve by computing [max(precisions[i:]) for i in range(len(precisions))]
-        # Basically, remove any temporary dips from the curve.
-        # At least that's what I think, idk. COCOEval did it so I do too.
-        for i in range(len(precisions) - 1, 0, -1):
-            if precisions[i] > precisions[i - 1]:
-                precisions[i - 1] = precisions[i]
-
-        # Compute the integral of precision(recall) d_recall from recall=0->1 using fixed-length riemann summation with 101 bars.
-        resolution = 100  # Standard COCO Resoluton
-        y_range = [0] * (
-            resolution + 1
-        )  # idx 0 is recall == 0.0 and idx 100 is recall == 1.00
-        x_range = np.array([x / resolution for x in range(resolution + 1)])
-        recalls = np.array(recalls)
-
-        # I realize this is weird, but all it does is find the nearest precision(x) for a given x in x_range.
-        # Basically, if the closest recall we have to 0.01 is 0.009 this sets precision(0.01) = precision(0.009).
-        # I approximate the integral this way, because that's how COCOEval does it.
-        indices = np.searchsorted(recalls, x_range, side="left")
-        for bar_idx, precision_idx in enumerate(indices):
-            if precision_idx < len(precisions):
-                y_range[bar_idx] = precisions[precision_idx]
-
-        self.curve = (x_range, y_range)
-
-        # Finally compute the riemann sum to get our integral.
-        # avg([precision(x) for x in 0:0.01:1])
-        return sum(y_range) / len(y_range) * 100
+        if self._ap is None:
+            is_true = self._get_sorted()[1]
+            self._ap, self.curve = compute_ap(is_true, self.num_gt_positives)
+
+        return self._ap
 
 
 class ClassedAPDataObject:
     """Stores an APDataObject for each class in the dataset."""
 
     def __init__(self):
-        self.objs = defaultdict(lambda: APDataObject())
+        self.objs = defaultdict(APDataObject)
 
     def apply_qualifier(self, pred_dict: dict, gt_dict: dict) -> object:
         ret = ClassedAPDataObject()
@@ -140,9 +226,45 @@ class ClassedAPDataObject:
     def push(self, class_: int, id: int, score: float, is_true: bool, info: dict = {}):
         self.objs[class_].push(id, score, is_true, info)
 
+    def push_arrays(
+        self,
+        classes: np.ndarray,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        is_true: np.ndarray,
+        ious: np.ndarray,
+        matched_with: np.ndarray,
+    ):
+        """
+        Pushes the data points of one image in the order given, with an info dict made from the iou and,
+        for true positives, the id of the gt they got matched with.
+        """
+        for _cls, _id, score, used, iou, gt_id in zip(
+            classes.tolist(),
+            ids.tolist(),
+            scores.tolist(),
+            is_true.tolist(),
+            ious.tolist(),
+            matched_with.tolist(),
+        ):
+            info = {"iou": iou, "used": used}
+            if used:
+                info["matched_with"] = gt_id
+
+            self.objs[_cls].push(_id, score, used, info)
+
+    def extend(self, other: "ClassedAPDataObject"):
+        """Adds the data of every class in another ClassedAPDataObject to this one."""
+        for _class, obj in other.objs.items():
+            self.objs[_class].extend(obj)
+
     def push_false_negative(self, class_: int, id: int):
         self.objs[class_].push_false_negative(id)
 
+    def push_false_negatives(self, classes: np.ndarray, ids: np.ndarray):
+        for _cls, _id in zip(classes.tolist(), ids.tolist()):
+            self.objs[_cls].push_false_negative(_id)
+
     def add_gt_positives(self, class_: int, num_positives: int):
         self.objs[class_].add_gt_positives(num_positives)
 
@@ -150,9 +272,26 @@ class ClassedAPDataObject:
         # Include all classes that have data points (predictions), even if they have no GT
         aps = []
         for obj in self.objs.values():
-            if len(obj.data_points) > 0 or obj.num_gt_positives > 0:
+            if obj._num_points() > 0 or obj.num_gt_positives > 0:
                 aps.append(obj.get_ap())
-        
+
+
+        if len(aps) == 0:
+            return 0.0
+        return sum(aps) / len(aps)
+
+    def get_qualified_mAP(self, pred_mask: np.ndarray, gt_mask: np.ndarray) -> float:
+        """
+        The same as apply_qualifier(...).get_mAP() for the ids in pred_mask and gt_mask, which are boolean
+        arrays indexed by annotation id, but without making new data objects.
+        """
+        aps = []
+        for obj in self.objs.values():
+            is_true, num_gt_positives = obj._qualify(pred_mask, gt_mask)
+
+            if len(is_true) > 0 or num_gt_positives > 0:
+                aps.append(compute_ap(is_true, num_gt_positives)[0] if num_gt_positives > 0 else 0)
+
         if len(aps) == 0:
             return 0.0
         return sum(aps) / len(aps)
@@ -165,15 +304,339 @@ class ClassedAPDataObject:
             # Average out the curves when using all categories
             curves = [x.get_pr_curve() for x in list(self.objs.values())]
             x_range = curves[0][0]
-            y_range = [0] * len(curves[0][1])
-
-            for x, y in curves:
-                for i in range(len(y)):
-                    y_range[i] += y[i]
-
-            for i in range(len(y_range)):
-                y_range[i] /= len(curves)
+            y_range = np.mean([y for _, y in curves], axis=0)
         else:
             x_range, y_range = self.objs[cat_id].get_pr_curve()
 
         return x_range, y_range
+
+
+# A data point of a CompactAPDataObject, where matched_with is -1 for false positives
+_POINT_DTYPE = np.dtype(
+    [
+        ("_id", np.int64),
+        ("score", np.float64),
+        ("is_true", bool),
+        ("iou", np.float64),
+        ("matched_with", np.int64),
+    ]
+)
+
+
+class CompactAPDataObject(APDataObject):
+    """
+    An APDataObject that keeps its data points and false negatives as chunks of NumPy arrays instead of
+    Python objects, for when they're pushed an image at a time for a long while (see TIDEStream).
+
+    Only the iou and the gt a true positive got matched with are kept of the info of a data point, and
+    data_points and false_negatives are created from the chunks when they're accessed.
+    """
+
+    def __init__(self):
+        self.num_gt_positives = 0
+        self.curve = None
+
+        # Chunks of rows of _POINT_DTYPE and of false negative ids, in the order they were pushed
+        self._point_chunks = []
+        self._false_negative_chunks = []
+
+        self._ap = None
+        self._sorted = None
+        self._sorted_ids = None
+        self._data_points = None
+
+    def _clear_cache(self):
+        super()._clear_cache()
+        self._data_points = None
+
+    def _get_points(self) -> np.ndarray:
+        if len(self._point_chunks) != 1:
+            self._point_chunks = [np.concatenate([np.zeros(0, _POINT_DTYPE)] + self._point_chunks)]
+        return self._point_chunks[0]
+
+    @property
+    def data_points(self) -> dict:
+        if self._data_points is None:
+            points = self._get_points()
+            self._data_points = {}
+
+            for _id, score, is_true, iou, gt_id in zip(
+                points["_id"].tolist(),
+                points["score"].tolist(),
+                points["is_true"].tolist(),
+                points["iou"].tolist(),
+                points["matched_with"].tolist(),
+            ):
+                info = {"iou": iou, "used": is_true}
+                if is_true:
+                    info["matched_with"] = gt_id
+                self._data_points[_id] = (score, is_true, info)
+
+        return self._data_points
+
+    @property
+    def false_negatives(self) -> set:
+        return set(np.concatenate([np.zeros(0, np.int64)] + self._false_negative_chunks).tolist())
+
+    def push_arrays(
+        self,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        is_true: np.ndarray,
+        ious: np.ndarray,
+        matched_with: np.ndarray,
+    ):
+        points = np.zeros(len(ids), _POINT_DTYPE)
+        points["_id"] = ids
+        points["score"] = scores
+        points["is_true"] = is_true
+        points["iou"] = ious
+        points["matched_with"] = np.where(is_true, matched_with, -1)
+
+        self._point_chunks.append(points)
+        self._clear_cache()
+
+    def push(self, id: int, score: float, is_true: bool, info: dict = {}):
+        self.push_arrays(
+            [id], [score], [is_true], [info.get("iou", np.nan)], [info.get("matched_with", -1)]
+        )
+
+    def push_many(self, ids: list, scores: list, is_true: bool, info: dict = {}):
+        num_points = len(ids)
+        self.push_arrays(
+            ids,
+            scores,
+            np.full(num_points, is_true),
+            np.full(num_points, info.get("iou", np.nan)),
+            np.full(num_points, info.get("matched_with", -1)),
+        )
+
+    def push_false_negative(self, id: int):
+        self.push_false_negatives([id])
+
+    def push_false_negatives(self, ids: list):
+        self._false_negative_chunks.append(np.asarray(ids, dtype=np.int64))
+
+    def extend(self, other: APDataObject):
+        for _id, (score, is_true, info) in other.data_points.items():
+            self.push(_id, score, is_true, info)
+        self.push_false_negatives(list(other.false_negatives))
+        self.num_gt_positives += other.num_gt_positives
+        self._clear_cache()
+
+    def _num_points(self) -> int:
+        return sum(len(x) for x in self._point_chunks)
+
+    def _get_sorted(self) -> tuple:
+        if self._sorted is None:
+            points = self._get_points()
+            order = np.argsort(-points["score"], kind="stable")
+            self._sorted = (points["score"][order], points["is_true"][order], order)
+
+        return self._sorted
+
+    def _get_sorted_ids(self) -> tuple:
+        if self._sorted_ids is None:
+            points = self._get_points()[self._get_sorted()[2]]
+            self._sorted_ids = (points["_id"], points["matched_with"])
+
+        return self._sorted_ids
+
+
+class CompactClassedAPDataObject(ClassedAPDataObject):
+    """A ClassedAPDataObject with a CompactAPDataObject for each class."""
+
+    def __init__(self):
+        self.objs = defaultdict(CompactAPDataObject)
+
+    def push_arrays(
+        self,
+        classes: np.ndarray,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        is_true: np.ndarray,
+        ious: np.ndarray,
+        matched_with: np.ndarray,
+    ):
+        # One chunk per class, with the classes in the order they first show up
+        unique_classes, first = np.unique(classes, return_index=True)
+        for _cls in unique_classes[np.argsort(first)].tolist():
+            in_class = classes == _cls
+            self.objs[_cls].push_arrays(
+                ids[in_class], scores[in_class], is_true[in_class], ious[in_class], matched_with[in_class]
+            )
+
+    def push_false_negatives(self, classes: np.ndarray, ids: np.ndarray):
+        unique_classes, first = np.unique(classes, return_index=True)
+        for _cls in unique_classes[np.argsort(first)].tolist():
+            self.objs[_cls].push_false_negatives(ids[classes == _cls])
+
+
+class IncrementalAPData:
+    """
+    Per-class AP state for quickly computing the mAP after swapping groups of data points in or out,
+    which is all that fixing an error amounts to.
+
+    Every data point that can show up in any fixed version of the AP data is stored once, in one array
+    sorted by class and then descending by score (ties stay in the order they were given). Data points
+    can have an owner (e.g., the index of the error they came from, or -1 for none). A data point with
+    is_fix=False is there unless its owner gets fixed, and one with is_fix=True is only there if its owner
+    gets fixed. Owners can also add gt_deltas to the number of GT positives of a class when fixed.
+
+    The AP of every class with nothing fixed is cached, so fixing a set of owners only recomputes the
+    classes that those owners touch.
+    """
+
+    def __init__(
+        self,
+        num_gt_positives: dict,
+        classes: list,
+        scores: np.ndarray,
+        is_true: np.ndarray,
+        owners: np.ndarray,
+        is_fix: np.ndarray,
+        gt_owners: np.ndarray = (),
+        gt_classes: list = (),
+        gt_deltas: np.ndarray = (),
+    ):
+        # Classes keep the order of num_gt_positives so that the mAP is summed up in the same order
+        self.class_ids = list(num_gt_positives.keys())
+        self._class_idx = {_cls: idx for idx, _cls in enumerate(self.class_ids)}
+
+        for _cls in list(classes) + list(gt_classes):
+            if _cls not in self._class_idx:
+                self._class_idx[_cls] = len(self.class_ids)
+                self.class_ids.append(_cls)
+
+        num_classes = len(self.class_ids)
+        class_idx = np.array([self._class_idx[x] for x in classes], dtype=np.int64)
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Sort by class, then descending by score. Lexsort is stable, so ties keep the given order.
+        order = np.lexsort((-scores, class_idx))
+        self._classes = class_idx[order]
+        self._is_true = np.asarray(is_true, dtype=bool)[order]
+        self._owners = np.asarray(owners, dtype=np.int64)[order]
+        self._is_fix = np.asarray(is_fix, dtype=bool)[order]
+        self._offsets = np.searchsorted(self._classes, np.arange(num_classes + 1))
+
+        self._gt_owners = np.asarray(gt_owners, dtype=np.int64)
+        self._gt_classes = np.array(
+            [self._class_idx[x] for x in gt_classes], dtype=np.int64
+        )
+        self._gt_deltas = np.asarray(gt_deltas, dtype=np.int64)
+
+        self._num_gt = np.array(
+            [num_gt_positives.get(x, 0) for x in self.class_ids], dtype=np.int64
+        )
+
+        # The state with nothing fixed, which every query starts from
+        self._aps = np.zeros(num_classes)
+        self._included = np.zeros(num_classes, dtype=bool)
+        self._update_classes(
+            np.arange(num_classes), ~self._is_fix, self._num_gt, self._aps, self._included
+        )
+
+    def _update_classes(
+        self,
+        class_idx: np.ndarray,
+        active: np.ndarray,
+        num_gt: np.ndarray,
+        aps: np.ndarray,
+        included: np.ndarray,
+        true_first: bool = False,
+    ):
+        """Recomputes the AP of the given classes in place, using only the active data points."""
+        for idx in class_idx.tolist():
+            start, end = self._offsets[idx], self._offsets[idx + 1]
+            is_true = self._is_true[start:end][active[start:end]]
+
+            if true_first:
+                # Stable, so this just moves every true positive in front of the false positives
+                is_true = is_true[np.argsort(~is_true, kind="stable")]
+
+            # Same as ClassedAPDataObject.get_mAP: skip classes without data points or GT
+            included[idx] = len(is_true) > 0 or num_gt[idx] > 0
+            aps[idx] = compute_ap(is_true, num_gt[idx])[0] if num_gt[idx] > 0 else 0
+
+    def get_mAP(
+        self, fixed: np.ndarray = None, gt_offsets: dict = None, true_first: bool = False
+    ) -> float:
+        """
+        Computes the mAP with the owners in the boolean array fixed (indexed by owner) fixed.
+        gt_offsets can map a class to an extra number of GT positives to add to that class,
+        and true_first moves all true positives in front of the false positives (perfect precision).
+        """
+        aps = self._aps.copy()
+        included = self._included.copy()
+        num_gt = self._num_gt.copy()
+
+        touched = np.zeros(len(self.class_ids), dtype=bool)
+        active = ~self._is_fix
+
+        if fixed is not None and fixed.any():
+            self._fix_owners(fixed, active, num_gt, touched)
+
+        if gt_offsets is not None:
+            for _cls, offset in gt_offsets.items():
+                if _cls in self._class_idx:
+                    num_gt[self._class_idx[_cls]] += offset
+                    touched[self._class_idx[_cls]] = True
+
+        if true_first:
+            touched[:] = True
+
+        self._update_classes(
+            np.flatnonzero(touched), active, num_gt, aps, included, true_first
+        )
+
+        return self._mean_ap(aps, included)
+
+    def get_progressive_mAPs(self, steps: list) -> list:
+        """
+        Computes the mAP after each step in steps, where every step is a boolean array (indexed by owner)
+        of the owners to fix on top of the ones fixed in the steps before it. The state is carried over from
+        one step to the next, so each step only recomputes the classes that its own owners touch.
+        """
+        aps = self._aps.copy()
+        included = self._included.copy()
+        num_gt = self._num_gt.copy()
+        active = ~self._is_fix
+
+        fixed = None
+        mAPs = []
+
+        for step in steps:
+            # Owners that were already fixed by an earlier step stay fixed
+            step = step if fixed is None else step & ~fixed
+            fixed = step if fixed is None else fixed | step
+
+            touched = np.zeros(len(self.class_ids), dtype=bool)
+            if step.any():
+                self._fix_owners(step, active, num_gt, touched)
+                self._update_classes(np.flatnonzero(touched), active, num_gt, aps, included)
+
+            mAPs.append(self._mean_ap(aps, included))
+
+        return mAPs
+
+    def _fix_owners(
+        self, fixed: np.ndarray, active: np.ndarray, num_gt: np.ndarray, touched: np.ndarray
+    ):
+        """Swaps the original data points of the owners in fixed out for their fixed ones, all in place."""
+        has_owner = self._owners >= 0
+        owner_fixed = np.zeros(len(self._owners), dtype=bool)
+        owner_fixed[has_owner] = fixed[self._owners[has_owner]]
+
+        active ^= owner_fixed
+        touched[self._classes[owner_fixed]] = True
+
+        gt_fixed = fixed[self._gt_owners]
+        np.add.at(num_gt, self._gt_classes[gt_fixed], self._gt_deltas[gt_fixed])
+        touched[self._gt_classes[gt_fixed]] = True
+
+    @staticmethod
+    def _mean_ap(aps: np.ndarray, included: np.ndarray) -> float:
+        if not included.any():
+            return 0.0
+        return sum(aps[included].tolist()) / int(included.sum())
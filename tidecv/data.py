@@ -1,6 +1,249 @@
 """ Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
 
-from collections import defaultdict
+import threading
+from collections.abc import Mapping, MutableMapping
+
+import numpy as np
+
+# Stored in the class column for annotations that have no class (e.g., class-less ignore regions)
+_NO_CLASS = np.iinfo(np.int64).min
+
+
+class AnnotationView:
+    """
+    The annotations of a single image, as returned by Data.get.
+
+    The columns (ids, classes, scores, boxes, ignore) are NumPy views into the Data object they
+    came from, so don't modify them. Missing boxes are rows of nan and a class of None is stored
+    as a sentinel. Iterating over the view (or indexing it with an int) gives the annotation dicts
+    instead, so it can still be used anywhere a list of annotations was expected. Indexing it with
+    a slice or an index / boolean array gives another view of just those annotations.
+    """
+
+    __slots__ = ("_data", "_dicts", "_masks", "ids", "classes", "scores", "boxes", "ignore")
+
+    def __init__(
+        self,
+        data: "Data",
+        ids: np.ndarray,
+        classes: np.ndarray,
+        scores: np.ndarray,
+        boxes: np.ndarray,
+        ignore: np.ndarray,
+    ):
+        self._data = data
+        self.ids = ids
+        self.classes = classes
+        self.scores = scores
+        self.boxes = boxes
+        self.ignore = ignore
+
+        # For views of annotations that aren't in a Data object, see from_list
+        self._dicts = None
+        self._masks = None
+
+    @classmethod
+    def from_list(cls, annotations: list) -> "AnnotationView":
+        """
+        Makes a view of annotation dicts that aren't stored in a Data object (e.g., the ones added to a
+        TIDEStream). Iterating over the view gives back those same dicts.
+        """
+        num_anns = len(annotations)
+        nan_box = [np.nan] * 4
+
+        view = cls(
+            None,
+            np.fromiter((x["_id"] for x in annotations), dtype=np.int64, count=num_anns),
+            np.fromiter(
+                (_NO_CLASS if x["class"] is None else x["class"] for x in annotations),
+                dtype=np.int64,
+                count=num_anns,
+            ),
+            np.fromiter((x.get("score", 1) for x in annotations), dtype=np.float64, count=num_anns),
+            np.array(
+                [nan_box if x.get("bbox") is None else x["bbox"] for x in annotations], dtype=np.float64
+            ).reshape(-1, 4),
+            np.fromiter((x.get("ignore", False) for x in annotations), dtype=bool, count=num_anns),
+        )
+        view._dicts = list(annotations)
+        view._masks = [x.get("mask") for x in annotations]
+        return view
+
+    @property
+    def masks(self) -> list:
+        if self._masks is not None:
+            return list(self._masks)
+        return [self._data._masks[x] for x in self.ids]
+
+    @property
+    def has_mask(self) -> np.ndarray:
+        if self._masks is not None:
+            return np.array([x is not None for x in self._masks], dtype=bool)
+        return self._data._has_mask[self.ids]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, idx: object) -> object:
+        if isinstance(idx, (int, np.integer)):
+            if self._dicts is not None:
+                return self._dicts[idx]
+            return self._data.annotations[self.ids[idx]]
+
+        view = AnnotationView(
+            self._data, self.ids[idx], self.classes[idx], self.scores[idx], self.boxes[idx], self.ignore[idx]
+        )
+        if self._dicts is not None:
+            positions = np.arange(len(self.ids))[idx].tolist()
+            view._dicts = [self._dicts[x] for x in positions]
+            view._masks = [self._masks[x] for x in positions]
+        return view
+
+    def __iter__(self):
+        if self._dicts is not None:
+            return iter(self._dicts)
+
+        annotations = self._data.annotations
+        return (annotations[x] for x in self.ids.tolist())
+
+
+class _ImageEntry(MutableMapping):
+    """
+    (Compatibility) The {"name": ..., "anns": [...]} dict of one image in Data.images. Setting the name
+    renames the image, while the annotation ids are a fresh list every time and can't be set.
+    """
+
+    __slots__ = ("_data", "_image_id")
+
+    def __init__(self, data: "Data", image_id: int):
+        self._data = data
+        self._image_id = image_id
+
+    def __getitem__(self, key: str) -> object:
+        if key == "name":
+            return self._data._image_names.get(self._image_id)
+        elif key == "anns":
+            return self._data.get(self._image_id).ids.tolist()
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: object):
+        if key != "name":
+            raise TypeError("Only the name of an image can be set, add annotations through the Data object.")
+        self._data._image_names[self._image_id] = value
+
+    def __delitem__(self, key: str):
+        raise TypeError("Image entries always have a name and anns.")
+
+    def __iter__(self):
+        return iter(("name", "anns"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _ImageMap(Mapping):
+    """
+    (Compatibility) Data.images, which maps an image id to its _ImageEntry. Like the defaultdict it replaces,
+    looking up an image that isn't registered yet registers it without a name.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: "Data"):
+        self._data = data
+
+    def __getitem__(self, image_id: int) -> _ImageEntry:
+        names = self._data._image_names
+        if image_id not in names:
+            names[image_id] = None
+        return _ImageEntry(self._data, image_id)
+
+    def __contains__(self, image_id: int) -> bool:
+        return image_id in self._data._image_names
+
+    def get(self, image_id: int, default: object = None) -> object:
+        # Unlike [], this doesn't register the image
+        return self[image_id] if image_id in self else default
+
+    def __iter__(self):
+        return iter(self._data._image_names)
+
+    def __len__(self) -> int:
+        return len(self._data._image_names)
+
+    def __repr__(self) -> str:
+        return repr({k: dict(v) for k, v in self.items()})
+
+
+class ImageGT:
+    """
+    The ground truth of a single image, split into views of the gt and of the ignore regions once,
+    so that every run (and every threshold) that evaluates this image can reuse it.
+    annotations can be an AnnotationView or a list of annotation dicts.
+    """
+
+    __slots__ = ("gt", "ignore_regions", "ids", "classes", "boxes", "ignored_classes", "positives")
+
+    def __init__(self, annotations: object, ignored_classes: set = None):
+        if not isinstance(annotations, AnnotationView):
+            annotations = AnnotationView.from_list(annotations)
+
+        if annotations.ignore.any():
+            self.gt = annotations[~annotations.ignore]
+            self.ignore_regions = annotations[annotations.ignore]
+        else:
+            self.gt = annotations
+            self.ignore_regions = annotations[:0]
+
+        self.ids = self.gt.ids
+        self.classes = self.gt.classes
+        self.boxes = self.gt.boxes
+
+        # Classes ignored in the whole image, or None if they weren't looked up
+        self.ignored_classes = ignored_classes
+
+        # The number of gt of each class, in the order the classes first appear
+        self.positives = {}
+        for _cls in self.classes.tolist():
+            self.positives[_cls] = self.positives.get(_cls, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self.gt) + len(self.ignore_regions)
+
+
+class GTIndex:
+    """
+    The ImageGT of every image in a ground truth Data object, built in one go.
+    Get it with Data.get_gt_index, which caches it until the data changes.
+    """
+
+    def __init__(self, data: "Data"):
+        offsets, order, classes, scores, boxes, ignore = data._get_index()
+
+        # Ignore regions with a class but without a box or mask ignore that class in the whole image
+        whole_image = ignore & np.isnan(boxes[:, 0]) & ~data._has_mask[order] & (classes != _NO_CLASS)
+
+        self.images = {}
+        for image_id, (start, end) in offsets.items():
+            ignored_classes = set()
+            if whole_image[start:end].any():
+                image_classes = classes[start:end]
+                ignored_classes = set(image_classes[whole_image[start:end]].tolist()).difference(
+                    image_classes[~ignore[start:end]].tolist()
+                )
+
+            view = AnnotationView(
+                data, order[start:end], classes[start:end], scores[start:end], boxes[start:end], ignore[start:end]
+            )
+            self.images[image_id] = ImageGT(view, ignored_classes)
+
+        self._empty = ImageGT([], set())
+
+    def get(self, image_id: int) -> ImageGT:
+        return self.images.get(image_id, self._empty)
 
 
 class Data:
@@ -12,36 +255,64 @@ class Data:
     Also, don't mix ground truth with predictions. Keep them in separate data objects.
 
     'max_dets' specifies the maximum number of detections the model is allowed to output for a given image.
+
+    Internally, annotations are stored column-wise in NumPy arrays indexed by annotation id, with a
+    per-image offset index that's built lazily the first time it's needed after a change.
+
+    Once all the data is added, the same object can be read by several evaluations at once (e.g., from
+    a thread pool), since the lazily built parts are guarded by a lock. Adding data during an evaluation
+    is not supported.
     """
 
+    # The array columns that hold one entry per annotation
+    _columns = ("_image_ids", "_class_ids", "_scores", "_boxes", "_has_mask", "_ignore")
+
     def __init__(self, name: str, max_dets: int = 100):
         self.name = name
         self.max_dets = max_dets
 
         self.classes = {}  # Maps class ID to class name
-        self.annotations = (
-            []
-        )  # Maps annotation ids to the corresponding annotation / prediction
+        self._image_names = {}  # Maps image ID to image name
+        self._images = _ImageMap(self)  # See images
+
+        # Annotation columns. These are grown geometrically, so only the first _num_anns rows are valid.
+        self._num_anns = 0
+        self._image_ids = np.zeros(0, dtype=np.int64)
+        self._class_ids = np.zeros(0, dtype=np.int64)
+        self._scores = np.zeros(0, dtype=np.float64)
+        self._boxes = np.zeros((0, 4), dtype=np.float64)
+        self._has_mask = np.zeros(0, dtype=bool)
+        self._ignore = np.zeros(0, dtype=bool)
+        self._masks = []  # Masks are ragged, so they're kept in a list
+
+        self._index = None  # The per-image index, see _get_index
+        self._gt_index = None  # The per-image gt, see get_gt_index
+        self._annotations = []  # Annotation dicts, only created when asked for
+        self._lock = threading.RLock()  # Guards building the three above
 
-        # Maps an image id to an image name and a list of annotation ids
-        self.images = defaultdict(lambda: {"name": None, "anns": []})
+    def __getstate__(self) -> dict:
+        # Locks can't be pickled (e.g., to send this to worker processes)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
 
     def _get_ignored_classes(self, image_id: int) -> set:
         anns = self.get(image_id)
 
-        classes_in_image = set()
-        ignored_classes = set()
+        # Ignore regions with a class but without a box or mask ignore that class in the whole image
+        whole_image = (
+            anns.ignore
+            & np.isnan(anns.boxes[:, 0])
+            & ~anns.has_mask
+            & (anns.classes != _NO_CLASS)
+        )
 
-        for ann in anns:
-            if ann["ignore"]:
-                if (
-                    ann["class"] is not None
-                    and ann["bbox"] is None
-                    and ann["mask"] is None
-                ):
-                    ignored_classes.add(ann["class"])
-            else:
-                classes_in_image.add(ann["class"])
+        ignored_classes = set(anns.classes[whole_image].tolist())
+        classes_in_image = set(anns.classes[~anns.ignore].tolist())
 
         return ignored_classes.difference(classes_in_image)
 
@@ -52,8 +323,8 @@ class Data:
             self.classes[id] = "Class " + str(id)
 
     def _make_default_image(self, id: int):
-        if self.images[id]["name"] is None:
-            self.images[id]["name"] = "Image " + str(id)
+        if self._image_names.get(id) is None:
+            self._image_names[id] = "Image " + str(id)
 
     def _prepare_box(self, box: object):
         return box
@@ -61,6 +332,20 @@ class Data:
     def _prepare_mask(self, mask: object):
         return mask
 
+    def _reserve(self, num_anns: int):
+        """(For internal use) Makes sure the columns have room for num_anns annotations."""
+        capacity = len(self._scores)
+        if num_anns <= capacity:
+            return
+
+        capacity = max(num_anns, 2 * capacity, 64)
+
+        for col in self._columns:
+            old = getattr(self, col)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self._num_anns] = old[: self._num_anns]
+            setattr(self, col, new)
+
     def _add(
         self,
         image_id: int,
@@ -73,21 +358,80 @@ class Data:
         """Add a data object to this collection. You should use one of the below functions instead."""
         self._make_default_class(class_id)
         self._make_default_image(image_id)
-        new_id = len(self.annotations)
-
-        self.annotations.append(
-            {
-                "_id": new_id,
-                "score": score,
-                "image": image_id,
-                "class": class_id,
-                "bbox": self._prepare_box(box),
-                "mask": self._prepare_mask(mask),
-                "ignore": ignore,
-            }
+        new_id = self._num_anns
+
+        box = self._prepare_box(box)
+        mask = self._prepare_mask(mask)
+
+        self._reserve(new_id + 1)
+        self._image_ids[new_id] = image_id
+        self._class_ids[new_id] = _NO_CLASS if class_id is None else class_id
+        self._scores[new_id] = score
+        self._boxes[new_id] = np.nan if box is None else box
+        self._has_mask[new_id] = mask is not None
+        self._ignore[new_id] = ignore
+        self._masks.append(mask)
+
+        self._num_anns += 1
+        self._index = None
+        self._gt_index = None
+
+    def _add_bulk(
+        self,
+        image_ids: np.ndarray,
+        class_ids: np.ndarray,
+        boxes: np.ndarray = None,
+        masks: list = None,
+        scores: np.ndarray = None,
+    ):
+        """Add many data objects to this collection at once. You should use one of the bulk functions below instead."""
+        image_ids = np.asarray(image_ids, dtype=np.int64).reshape(-1)
+        class_ids = np.asarray(class_ids, dtype=np.int64).reshape(-1)
+        num_new = len(image_ids)
+
+        scores = (
+            np.ones(num_new)
+            if scores is None
+            else np.asarray(scores, dtype=np.float64).reshape(-1)
         )
+        boxes = (
+            np.full((num_new, 4), np.nan)
+            if boxes is None
+            else np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        )
+        masks = [None] * num_new if masks is None else list(masks)
+
+        if not (
+            len(class_ids) == len(scores) == len(boxes) == len(masks) == num_new
+        ):
+            raise ValueError("All bulk inputs need to have the same length!")
 
-        self.images[image_id]["anns"].append(new_id)
+        # Register new classes and images in the order they first appear, same as adding them one by one
+        for ids, make_default in (
+            (class_ids, self._make_default_class),
+            (image_ids, self._make_default_image),
+        ):
+            unique, first = np.unique(ids, return_index=True)
+            for _id in unique[np.argsort(first)].tolist():
+                make_default(_id)
+
+        start = self._num_anns
+        end = start + num_new
+
+        self._reserve(end)
+        self._image_ids[start:end] = image_ids
+        self._class_ids[start:end] = class_ids
+        self._scores[start:end] = scores
+        self._boxes[start:end] = boxes
+        self._has_mask[start:end] = np.fromiter(
+            (x is not None for x in masks), dtype=bool, count=num_new
+        )
+        self._ignore[start:end] = False
+        self._masks.extend(masks)
+
+        self._num_anns = end
+        self._index = None
+        self._gt_index = None
 
     def add_ground_truth(
         self, image_id: int, class_id: int, box: object = None, mask: object = None
@@ -106,6 +450,33 @@ class Data:
         """Add a predicted detection. If box or mask is None, this prediction will be ignored for that mode."""
         self._add(image_id, class_id, box, mask, score=score)
 
+    def add_ground_truths_bulk(
+        self,
+        image_ids: np.ndarray,
+        class_ids: np.ndarray,
+        boxes: np.ndarray = None,
+        masks: list = None,
+    ):
+        """
+        Add N ground truths at once. image_ids and class_ids are length N arrays and boxes is an (N, 4) array.
+        masks, if given, is a list of N masks. Boxes and masks are stored as given.
+        """
+        self._add_bulk(image_ids, class_ids, boxes, masks)
+
+    def add_detections_bulk(
+        self,
+        image_ids: np.ndarray,
+        class_ids: np.ndarray,
+        scores: np.ndarray,
+        boxes: np.ndarray = None,
+        masks: list = None,
+    ):
+        """
+        Add N predicted detections at once. image_ids, class_ids and scores are length N arrays and boxes is
+        an (N, 4) array. masks, if given, is a list of N masks. Boxes and masks are stored as given.
+        """
+        self._add_bulk(image_ids, class_ids, boxes, masks, scores=scores)
+
     def add_ignore_region(
         self,
         image_id: int,
@@ -128,8 +499,102 @@ class Data:
 
     def add_image(self, id: int, name: str):
         """Register an image name/path with an image ID."""
-        self.images[id]["name"] = name
+        self._image_names[id] = name
+
+    @property
+    def image_ids(self) -> list:
+        """The ids of every image registered with this object, including images without annotations."""
+        return list(self._image_names.keys())
+
+    @property
+    def images(self) -> Mapping:
+        """
+        (Compatibility) Maps an image id to a dict-like {"name": ..., "anns": [...]} of its name and annotation ids.
+        Setting an image's name there is the same as add_image, and looking up an unknown image registers it.
+        """
+        return self._images
+
+    @property
+    def annotations(self) -> list:
+        """
+        (Compatibility) A list of annotation dicts indexed by annotation id.
+        The dicts are created on first access and then reused. Evaluation reads the columns instead, so it
+        neither creates nor writes into them.
+        """
+        if len(self._annotations) == self._num_anns:
+            return self._annotations
+
+        with self._lock:
+            for _id in range(len(self._annotations), self._num_anns):
+                class_id = int(self._class_ids[_id])
+                box = self._boxes[_id]
+
+                self._annotations.append(
+                    {
+                        "_id": _id,
+                        "score": float(self._scores[_id]),
+                        "image": int(self._image_ids[_id]),
+                        "class": None if class_id == _NO_CLASS else class_id,
+                        "bbox": None if np.isnan(box[0]) else box.tolist(),
+                        "mask": self._masks[_id],
+                        "ignore": bool(self._ignore[_id]),
+                    }
+                )
+
+        return self._annotations
+
+    def _get_index(self) -> tuple:
+        """
+        (For internal use) Returns the per-image index, building it if the data changed since the last call.
+
+        The index is a tuple of (offsets, ids, classes, scores, boxes, ignore), where offsets maps an image id
+        to a (start, end) slice into the other arrays, which hold the annotations sorted by image id.
+        """
+        index = self._index
+        if index is not None:
+            return index
+
+        with self._lock:
+            if self._index is None:
+                n = self._num_anns
+                image_ids = self._image_ids[:n]
+
+                # Stable, so annotations within an image stay in the order they were added
+                order = np.argsort(image_ids, kind="stable")
+                unique, starts, counts = np.unique(
+                    image_ids[order], return_index=True, return_counts=True
+                )
+                offsets = dict(
+                    zip(unique.tolist(), zip(starts.tolist(), (starts + counts).tolist()))
+                )
+
+                self._index = (
+                    offsets,
+                    order,
+                    self._class_ids[:n][order],
+                    self._scores[:n][order],
+                    self._boxes[:n][order],
+                    self._ignore[:n][order],
+                )
+
+            return self._index
+
+    def get_gt_index(self) -> GTIndex:
+        """
+        Returns the gt of every image split and converted to arrays, see GTIndex. It's built the first time
+        it's asked for and then reused by every evaluation against this data, until annotations are added.
+        """
+        gt_index = self._gt_index
+        if gt_index is not None:
+            return gt_index
+
+        with self._lock:
+            if self._gt_index is None:
+                self._gt_index = GTIndex(self)
+            return self._gt_index
 
-    def get(self, image_id: int):
+    def get(self, image_id: int) -> AnnotationView:
         """Collects all the annotations / detections for that particular image."""
-        return [self.annotations[x] for x in self.images[image_id]["anns"]]
+        offsets, *columns = self._get_index()
+        start, end = offsets.get(image_id, (0, 0))
+        return AnnotationView(self, *[x[start:end] for x in columns])
@@ -2,9 +2,57 @@
 
 from typing import Union
 
+import numpy as np
+
+from .. import functions as f
+
+# What fixing an error does to its data point
+FIX_REMOVE = 0  # The data point is suppressed
+FIX_TRUE = 1  # The data point becomes a true positive
+FIX_GT = 2  # The data point stays missing, but its gt no longer counts as a positive
+
+# Every error a TIDERun finds is one row of this
+ERROR_DTYPE = np.dtype(
+    [
+        ("type", np.int8),  # Index into TIDE._error_types
+        ("pred", np.int64),  # Id of the prediction, or -1 if the error is for a gt
+        ("gt", np.int64),  # Id of the gt this error is linked to, or -1
+        ("suppressor", np.int64),  # Id of the prediction that took the gt of a DuplicateError, or -1
+        ("class", np.int64),  # Class of the original data point
+        ("score", np.float64),  # Score of the prediction, or NaN
+        ("iou", np.float64),  # Best IoU of the prediction with a gt of its class
+        ("ignored", np.bool_),  # The prediction was ignored, so it has no data point in the AP data
+        ("fixed_class", np.int64),  # Class of the fixed data point
+        ("fixed", np.int8),  # One of the FIX_* values above
+    ]
+)
+
 
 class Error:
-    """A base class for all error types."""
+    """
+    A base class for all error types.
+
+    Errors are lightweight views of one row of the error table in the TIDERun that found them,
+    and are only created when they're accessed through TIDERun.errors or TIDERun.error_dict.
+    """
+
+    def __init__(self, run, row: int):
+        self._run = run
+        self._row = row
+        self.disabled = False
+
+    @property
+    def _data(self) -> np.void:
+        return self._run.error_table[self._row]
+
+    def _info(self) -> dict:
+        data = self._data
+        return {"iou": float(data["iou"]), "used": None if data["ignored"] else False}
+
+    # Subclasses expose the annotations they have as properties, so hasattr can be used to check for them
+    _pred = property(lambda self: self._run._get_pred(int(self._data["pred"])))
+    _gt = property(lambda self: self._run._get_gt(int(self._data["gt"])))
+    _suppressor = property(lambda self: self._run._get_pred(int(self._data["suppressor"])))
 
     def fix(self) -> Union[tuple, None]:
         """
@@ -14,29 +62,40 @@ class Error:
         Return type is:
                 class:int, (score:float, is_positive:bool, info:dict)
         """
-        raise NotImplementedError
+        data = self._data
+
+        if data["fixed"] == FIX_TRUE:
+            return int(data["fixed_class"]), (float(data["score"]), True, self._info())
+        elif data["fixed"] == FIX_GT:
+            return int(data["fixed_class"]), -1
+        else:
+            return None
 
     def unfix(self) -> Union[tuple, None]:
         """Returns the original version of this data point."""
+        data = self._data
 
-        if hasattr(self, "pred"):
-            # If an ignored instance is an error, it's not in the data point list, so there's no "unfixed" entry
-            if self.pred["used"] is None:
-                return None
-            else:
-                return self.pred["class"], (
-                    self.pred["score"],
-                    False,
-                    self.pred["info"],
-                )
-        else:
+        # If an ignored instance is an error, it's not in the data point list, so there's no "unfixed" entry
+        if data["pred"] < 0 or data["ignored"]:
             return None
+        else:
+            return int(data["class"]), (float(data["score"]), False, self._info())
+
+    @property
+    def original(self) -> tuple:
+        return f.nonepack(self.unfix())
+
+    @property
+    def fixed(self) -> tuple:
+        return f.nonepack(self.fix())
 
     def get_id(self) -> int:
-        if hasattr(self, "pred"):
-            return self.pred["_id"]
-        elif hasattr(self, "gt"):
-            return self.gt["_id"]
+        data = self._data
+
+        if data["pred"] >= 0:
+            return int(data["pred"])
+        elif data["gt"] >= 0:
+            return int(data["gt"])
         else:
             return -1
 
@@ -81,41 +140,3 @@ class Error:
 
         return info
 
-
-class BestGTMatch:
-    """
-    Some errors are fixed by changing false positives to true positives.
-    The issue with fixing these errors naively is that you might have
-    multiple errors attempting to fix the same GT. In that case, we need
-    to select which error actually gets fixed, and which others just get
-    suppressed (since we can only fix one error per GT).
-
-    To address this, this class finds the prediction with the hiighest
-    score and then uses that as the error to fix, while suppressing all
-    other errors caused by the same GT.
-    """
-
-    def __init__(self, pred, gt):
-        self.pred = pred
-        self.gt = gt
-
-        if self.gt["used"]:
-            self.suppress = True
-        else:
-            self.suppress = False
-            self.gt["usable"] = True
-
-            score = self.pred["score"]
-
-            if not "best_score" in self.gt:
-                self.gt["best_score"] = -1
-
-            if self.gt["best_score"] < score:
-                self.gt["best_score"] = score
-                self.gt["best_id"] = self.pred["_id"]
-
-    def fix(self):
-        if self.suppress or self.gt["best_id"] != self.pred["_id"]:
-            return None
-        else:
-            return (self.pred["score"], True, self.pred["info"])
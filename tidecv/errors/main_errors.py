@@ -1,7 +1,7 @@
 """ Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
 
 
-from .error import BestGTMatch, Error
+from .error import Error
 
 
 class ClassError(Error):
@@ -12,16 +12,8 @@ class ClassError(Error):
     )
     short_name = "Cls"
 
-    def __init__(self, pred: dict, gt: dict, ex):
-        self.pred = pred
-        self.gt = gt
-
-        self.match = BestGTMatch(pred, gt) if not self.gt["used"] else None
-
-    def fix(self):
-        if self.match is None:
-            return None
-        return self.gt["class"], self.match.fix()
+    pred = Error._pred
+    gt = Error._gt
 
 
 class BoxError(Error):
@@ -32,16 +24,8 @@ class BoxError(Error):
     )
     short_name = "Loc"
 
-    def __init__(self, pred: dict, gt: dict, ex):
-        self.pred = pred
-        self.gt = gt
-
-        self.match = BestGTMatch(pred, gt) if not self.gt["used"] else None
-
-    def fix(self):
-        if self.match is None:
-            return None
-        return self.pred["class"], self.match.fix()
+    pred = Error._pred
+    gt = Error._gt
 
 
 class DuplicateError(Error):
@@ -52,12 +36,8 @@ class DuplicateError(Error):
     )
     short_name = "Dupe"
 
-    def __init__(self, pred: dict, suppressor: dict):
-        self.pred = pred
-        self.suppressor = suppressor
-
-    def fix(self):
-        return None
+    pred = Error._pred
+    suppressor = Error._suppressor
 
 
 class BackgroundError(Error):
@@ -68,11 +48,7 @@ class BackgroundError(Error):
     )
     short_name = "Bkg"
 
-    def __init__(self, pred: dict):
-        self.pred = pred
-
-    def fix(self):
-        return None
+    pred = Error._pred
 
 
 class OtherError(Error):
@@ -80,11 +56,7 @@ class OtherError(Error):
     description = "This detection didn't fall into any of the other error categories."
     short_name = "Both"
 
-    def __init__(self, pred: dict):
-        self.pred = pred
-
-    def fix(self):
-        return None
+    pred = Error._pred
 
 
 class MissedError(Error):
@@ -92,11 +64,7 @@ class MissedError(Error):
     description = "Represents GT missed by the model. Doesn't include GT corrected elsewhere in the model."
     short_name = "Miss"
 
-    def __init__(self, gt: dict):
-        self.gt = gt
-
-    def fix(self):
-        return self.gt["class"], -1
+    gt = Error._gt
 
 
 # These are special errors so no inheritence
@@ -1,6 +1,11 @@
 """ Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
 # Defines qualifiers like "Extra small box"
 
+import numpy as np
+
+# Qualifiers are stored as bits of one integer per annotation, see make_bitmask
+MAX_QUALIFIERS = 64
+
 
 def _area(x):
     return x["bbox"][2] * x["bbox"][3]
@@ -10,18 +15,49 @@ def _ar(x):
     return x["bbox"][2] / x["bbox"][3]
 
 
+def _areas(boxes: np.ndarray) -> np.ndarray:
+    return boxes[:, 2] * boxes[:, 3]
+
+
+def _ars(boxes: np.ndarray) -> np.ndarray:
+    return boxes[:, 2] / boxes[:, 3]
+
+
 class Qualifier:
     """
     Creates a qualifier with the given name.
 
     test_func should be a callable object (e.g., lambda) that takes in as input an annotation
     object (either a ground truth or prediction) and returns whether or not that object qualifies (i.e., a bool).
+
+    array_test is an optional vectorized version of test_func that takes in an (N, 4) array of bboxes and
+    returns a boolean array of which ones qualify. Annotations without a bbox are rows of nan.
+    If it's given, it's used instead of calling test_func on every annotation.
     """
 
-    def __init__(self, name: str, test_func: object):
+    def __init__(self, name: str, test_func: object, array_test: object = None):
         self.test = test_func
+        self.array_test = array_test
         self.name = name
 
+    def test_all(self, data) -> np.ndarray:
+        """
+        Returns a boolean array indexed by annotation id of which annotations in data qualify.
+        Ignore regions never qualify.
+        """
+        num_anns = data._num_anns
+
+        if self.array_test is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                qualifies = np.asarray(self.array_test(data._boxes[:num_anns]), dtype=bool)
+            return qualifies & ~data._ignore[:num_anns]
+        else:
+            return np.fromiter(
+                (not x["ignore"] and bool(self.test(x)) for x in data.annotations),
+                dtype=bool,
+                count=num_anns,
+            )
+
     # This is horrible, but I like it
     def _make_error_func(self, error_type):
         return (
@@ -34,14 +70,37 @@ class Qualifier:
         )
 
 
+def make_bitmask(data, quals: list) -> np.ndarray:
+    """
+    Tests every annotation in data against every qualifier in quals. Returns a uint64 array indexed by
+    annotation id, where bit i is set iff that annotation qualifies for quals[i].
+    """
+    if len(quals) > MAX_QUALIFIERS:
+        raise ValueError(f"At most {MAX_QUALIFIERS} qualifiers can be tested at once.")
+
+    bitmask = np.zeros(data._num_anns, dtype=np.uint64)
+    for bit, qual in enumerate(quals):
+        bitmask[qual.test_all(data)] |= np.uint64(1 << bit)
+
+    return bitmask
+
+
 AREA = [
-    Qualifier("Small", lambda x: _area(x) <= 32 ** 2),
-    Qualifier("Medium", lambda x: 32 ** 2 < _area(x) <= 96 ** 2),
-    Qualifier("Large", lambda x: 96 ** 2 < _area(x)),
+    Qualifier("Small", lambda x: _area(x) <= 32 ** 2, lambda b: _areas(b) <= 32 ** 2),
+    Qualifier(
+        "Medium",
+        lambda x: 32 ** 2 < _area(x) <= 96 ** 2,
+        lambda b: (32 ** 2 < _areas(b)) & (_areas(b) <= 96 ** 2),
+    ),
+    Qualifier("Large", lambda x: 96 ** 2 < _area(x), lambda b: 96 ** 2 < _areas(b)),
 ]
 
 ASPECT_RATIO = [
-    Qualifier("Tall", lambda x: _ar(x) <= 0.75),
-    Qualifier("Square", lambda x: 0.75 < _ar(x) <= 1.33),
-    Qualifier("Wide", lambda x: 1.33 < _ar(x)),
+    Qualifier("Tall", lambda x: _ar(x) <= 0.75, lambda b: _ars(b) <= 0.75),
+    Qualifier(
+        "Square",
+        lambda x: 0.75 < _ar(x) <= 1.33,
+        lambda b: (0.75 < _ars(b)) & (_ars(b) <= 1.33),
+    ),
+    Qualifier("Wide", lambda x: 1.33 < _ar(x), lambda b: 1.33 < _ars(b)),
 ]
@@ -0,0 +1,37 @@
+""" Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
+
+import numpy as np
+
+
+def box_iou(dets, gts, iscrowd=None) -> np.ndarray:
+    """
+    Computes the IoU between every detection box and every ground truth box in one go.
+
+    Both inputs are anything that converts to an (N, 4) / (M, 4) float array with rows of
+    [x1, y1, x2, y2], which is how TIDEExample has always compared boxes.
+    Returns an (N, M) array where A[i, j] is the IoU between dets[i] and gts[j].
+
+    Like pycocotools, if iscrowd[j] is True then gts[j] is a crowd region and A[i, j] is
+    instead the intersection over the area of dets[i]. Pairs with an empty union (e.g., two
+    zero-area boxes) have an IoU of 0, like in mask_utils.iou.
+    """
+    dets = np.asarray(dets, dtype=np.float64).reshape(-1, 4)
+    gts = np.asarray(gts, dtype=np.float64).reshape(-1, 4)
+
+    # Innermost corners of every (det, gt) pair
+    xi = np.maximum(dets[:, None, 0], gts[None, :, 0])
+    yi = np.maximum(dets[:, None, 1], gts[None, :, 1])
+    x2i = np.minimum(dets[:, None, 2], gts[None, :, 2])
+    y2i = np.minimum(dets[:, None, 3], gts[None, :, 3])
+
+    # Calculate areas
+    Aa = np.maximum(dets[:, 2] - dets[:, 0], 0) * np.maximum(dets[:, 3] - dets[:, 1], 0)
+    Ab = np.maximum(gts[:, 2] - gts[:, 0], 0) * np.maximum(gts[:, 3] - gts[:, 1], 0)
+    Ai = np.maximum(x2i - xi, 0) * np.maximum(y2i - yi, 0)
+
+    union = Aa[:, None] + Ab[None, :] - Ai
+    if iscrowd is not None:
+        union[:, np.asarray(iscrowd, dtype=bool)] = Aa[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, Ai / union, 0)
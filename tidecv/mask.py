@@ -0,0 +1,298 @@
+""" Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
+# A NumPy-only replacement for the parts of pycocotools.mask that TIDE needs.
+#
+# Masks can be given as binary arrays, lists of polygons in COCO format ([[x1, y1, x2, y2, ...], ...]),
+# or RLEs ({"size": [h, w], "counts": ...}) where counts is either a list of run lengths or a
+# compressed COCO string. RLEs run down the columns of the image, just like in pycocotools.
+#
+# Internally, a mask is a pair of (starts, ends) arrays holding the half-open intervals of foreground
+# pixels in that column-major order, which is what all of the area and IoU computations work on.
+
+import numpy as np
+
+
+def _string_to_counts(s) -> np.ndarray:
+    """Decodes the counts of a compressed COCO RLE string (the inverse of _counts_to_string)."""
+    if isinstance(s, str):
+        s = s.encode("ascii")
+    chars = np.frombuffer(s, dtype=np.uint8).astype(np.int64) - 48
+
+    if len(chars) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Every count is a little-endian run of 5 bit chunks, where bit 6 says whether the run continues
+    is_last = (chars & 0x20) == 0
+    ends = np.flatnonzero(is_last) + 1
+    starts = np.concatenate([[0], ends[:-1]])
+    chunk_idx = np.arange(len(chars)) - np.repeat(starts, ends - starts)
+
+    x = np.add.reduceat((chars & 0x1F) << (5 * chunk_idx), starts)
+
+    # Bit 5 of the last chunk is the sign bit
+    negative = (chars[ends - 1] & 0x10) != 0
+    x[negative] -= np.left_shift(1, 5 * (ends - starts)[negative])
+
+    # Past the first few, counts are stored relative to the count two before them
+    counts = x.copy()
+    counts[1::2] = np.cumsum(x[1::2])
+    counts[2::2] = np.cumsum(x[2::2])
+    return counts
+
+
+def _counts_to_string(counts: np.ndarray) -> bytes:
+    """Encodes run lengths as a compressed COCO RLE string."""
+    counts = np.asarray(counts, dtype=np.int64)
+    x = counts.copy()
+    x[3:] -= counts[1:-2]
+
+    # Emit 5 bits at a time until the rest of the value is just the sign
+    chars = []
+    active = np.ones(len(x), dtype=bool)
+    while active.any():
+        c = x & 0x1F
+        x = x >> 5
+        more = np.where(c & 0x10, x != -1, x != 0) & active
+        c = (c | np.where(more, 0x20, 0)) + 48
+        chars.append(np.where(active, c, 0))
+        active = more
+
+    chars = np.stack(chars, axis=1).ravel()
+    return chars[chars > 0].astype(np.uint8).tobytes()
+
+
+def _counts_to_intervals(counts: np.ndarray) -> tuple:
+    """Every odd run is foreground, so its interval is between the sums of the runs before and after it."""
+    bounds = np.cumsum(counts)
+    starts = bounds[0:-1:2]
+    ends = bounds[1::2]
+
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+def _intervals_to_counts(starts: np.ndarray, ends: np.ndarray, h: int, w: int) -> np.ndarray:
+    bounds = np.empty(2 * len(starts) + 2, dtype=np.int64)
+    bounds[0] = 0
+    bounds[1:-1:2] = starts
+    bounds[2:-1:2] = ends
+    bounds[-1] = h * w
+    return np.diff(bounds)
+
+
+def _merge_intervals(starts: np.ndarray, ends: np.ndarray) -> tuple:
+    """Returns the union of a set of possibly overlapping intervals as sorted, disjoint intervals."""
+    if len(starts) == 0:
+        return starts, ends
+
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+
+    # A new interval starts wherever nothing before it reaches that far
+    reach = np.maximum.accumulate(ends)
+    is_new = np.concatenate([[True], starts[1:] > reach[:-1]])
+
+    group_starts = np.flatnonzero(is_new)
+    return starts[group_starts], np.maximum.reduceat(ends, group_starts)
+
+
+def _polygon_to_intervals(poly: list, h: int, w: int) -> tuple:
+    """Rasterizes a single polygon [x1, y1, x2, y2, ...] the same way pycocotools' rleFrPoly does."""
+    xy = np.asarray(poly, dtype=np.float64).reshape(-1, 2)
+    if len(xy) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Upsample and get discrete points densely along the entire boundary
+    scale = 5
+    x = np.floor(scale * xy[:, 0] + 0.5).astype(np.int64)
+    y = np.floor(scale * xy[:, 1] + 0.5).astype(np.int64)
+    xs, ys = x, y
+    xe, ye = np.roll(x, -1), np.roll(y, -1)
+
+    dx, dy = np.abs(xe - xs), np.abs(ye - ys)
+    along_x = dx >= dy
+    flip = (along_x & (xs > xe)) | (~along_x & (ys > ye))
+    xs, xe = np.where(flip, xe, xs), np.where(flip, xs, xe)
+    ys, ye = np.where(flip, ye, ys), np.where(flip, ys, ye)
+
+    steps = np.maximum(dx, dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(along_x, (ye - ys) / dx, (xe - xs) / dy)
+
+    # Walk along every edge at once, in the same direction rleFrPoly does
+    edge = np.repeat(np.arange(len(xy)), steps + 1)
+    d = np.arange(len(edge)) - np.repeat(np.cumsum(steps + 1) - (steps + 1), steps + 1)
+    t = np.where(flip[edge], steps[edge] - d, d)
+
+    walk = np.floor(np.where(along_x, ys, xs)[edge] + slope[edge] * t + 0.5).astype(np.int64)
+    u = np.where(along_x[edge], t + xs[edge], walk)
+    v = np.where(along_x[edge], walk, t + ys[edge])
+
+    # Get the points along the y-boundary and downsample
+    changed = np.flatnonzero(u[1:] != u[:-1]) + 1
+    u_cur, u_prev = u[changed], u[changed - 1]
+    v_cur, v_prev = v[changed], v[changed - 1]
+
+    xd = np.where(u_cur < u_prev, u_cur, u_cur - 1)
+    xd = (xd + 0.5) / scale - 0.5
+    keep = (np.floor(xd) == xd) & (xd >= 0) & (xd <= w - 1)
+
+    yd = np.minimum(v_cur, v_prev)
+    yd = np.ceil(np.clip((yd + 0.5) / scale - 0.5, 0, h))
+
+    # Each boundary point toggles the mask on or off, so points on the same spot cancel out in pairs
+    toggles = (xd[keep] * h + yd[keep]).astype(np.int64)
+    toggles = toggles[toggles < h * w]
+    toggles, num = np.unique(toggles, return_counts=True)
+    toggles = toggles[num % 2 == 1]
+
+    if len(toggles) % 2 == 1:
+        toggles = np.append(toggles, h * w)
+
+    return toggles[0::2], toggles[1::2]
+
+
+def _canvas_size(masks: list) -> tuple:
+    """Finds an (h, w) that fits all the given masks. RLEs and binary masks have to agree on their size."""
+    size = None
+    extent = [0, 0]
+
+    for mask in masks:
+        if mask is None:
+            continue
+        elif isinstance(mask, dict) or isinstance(mask, np.ndarray):
+            mask_size = tuple(mask["size"]) if isinstance(mask, dict) else mask.shape
+            if size is not None and size != tuple(mask_size):
+                raise ValueError(
+                    "Masks have different sizes: {} and {}".format(size, mask_size)
+                )
+            size = tuple(mask_size)
+        else:
+            for poly in mask:
+                if len(poly) > 0:
+                    xy = np.asarray(poly, dtype=np.float64).reshape(-1, 2)
+                    extent[0] = max(extent[0], int(np.ceil(xy[:, 1].max())) + 1)
+                    extent[1] = max(extent[1], int(np.ceil(xy[:, 0].max())) + 1)
+
+    return size if size is not None else tuple(extent)
+
+
+def _to_intervals(mask: object, h: int, w: int) -> tuple:
+    """Converts a mask in any of the supported formats to its foreground intervals."""
+    if mask is None:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    elif isinstance(mask, np.ndarray):
+        return _counts_to_intervals(_mask_to_counts(mask))
+    elif isinstance(mask, dict):
+        counts = mask["counts"]
+        if isinstance(counts, (str, bytes)):
+            counts = _string_to_counts(counts)
+        return _counts_to_intervals(np.asarray(counts, dtype=np.int64))
+    else:
+        # A list of polygons is the union of all of them
+        intervals = [_polygon_to_intervals(poly, h, w) for poly in mask]
+        if len(intervals) == 0:
+            return _to_intervals(None, h, w)
+        starts = np.concatenate([x[0] for x in intervals])
+        ends = np.concatenate([x[1] for x in intervals])
+        return _merge_intervals(starts, ends)
+
+
+def _coverage(starts: np.ndarray, ends: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """For each position in x, the number of foreground pixels of the mask (starts, ends) before it."""
+    before = np.concatenate([[0], np.cumsum(ends - starts)])
+
+    # The last interval that starts at or before x is the only one that can be partially covered
+    last = np.searchsorted(starts, x, side="right") - 1
+    clipped = np.maximum(last, 0)
+    partial = np.clip(x - starts[clipped], 0, ends[clipped] - starts[clipped])
+
+    return np.where(last >= 0, before[clipped] + partial, 0)
+
+
+def _mask_to_counts(mask: np.ndarray) -> np.ndarray:
+    h, w = mask.shape
+    flat = mask.ravel(order="F") != 0
+
+    # Runs alternate between background and foreground, starting with background
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = np.diff(np.concatenate([[0], changes, [h * w]]))
+    if h * w > 0 and flat[0]:
+        counts = np.concatenate([[0], counts])
+    return counts
+
+
+def encode(mask: np.ndarray) -> dict:
+    """Encodes an (h, w) binary mask as a compressed RLE."""
+    mask = np.asarray(mask)
+    return {"size": list(mask.shape), "counts": _counts_to_string(_mask_to_counts(mask))}
+
+
+def decode(rle: dict) -> np.ndarray:
+    """Decodes an RLE (or any other supported mask format) into an (h, w) uint8 binary mask."""
+    h, w = _canvas_size([rle])
+    starts, ends = _to_intervals(rle, h, w)
+
+    flat = np.zeros(h * w + 1, dtype=np.int64)
+    np.add.at(flat, starts, 1)
+    np.add.at(flat, ends, -1)
+    return np.cumsum(flat[:-1]).astype(np.uint8).reshape(w, h).T
+
+
+def area(mask: object) -> int:
+    """The number of foreground pixels in a mask of any supported format."""
+    starts, ends = _to_intervals(mask, *_canvas_size([mask]))
+    return int((ends - starts).sum())
+
+
+def from_polygons(polygons: list, h: int, w: int) -> dict:
+    """Rasterizes a list of COCO polygons into a single (h, w) RLE."""
+    starts, ends = _to_intervals(polygons, h, w)
+    counts = _intervals_to_counts(starts, ends, h, w)
+    return {"size": [h, w], "counts": _counts_to_string(counts)}
+
+
+def merge(masks: list) -> dict:
+    """Returns the union of a list of masks as one RLE."""
+    h, w = _canvas_size(masks)
+    intervals = [_to_intervals(x, h, w) for x in masks]
+    starts, ends = _merge_intervals(
+        np.concatenate([x[0] for x in intervals] + [np.zeros(0, dtype=np.int64)]),
+        np.concatenate([x[1] for x in intervals] + [np.zeros(0, dtype=np.int64)]),
+    )
+    counts = _intervals_to_counts(starts, ends, h, w)
+    return {"size": [h, w], "counts": _counts_to_string(counts)}
+
+
+def iou(dets: list, gts: list, iscrowd: list = None) -> np.ndarray:
+    """
+    Computes the (len(dets), len(gts)) IoU matrix between two lists of masks, without decoding them.
+    Same as pycocotools, if iscrowd[j] is True, gts[j] is a crowd region and the IoU with it is
+    the intersection over the area of the detection instead.
+    """
+    h, w = _canvas_size(list(dets) + list(gts))
+    det_intervals = [_to_intervals(x, h, w) for x in dets]
+    gt_intervals = [_to_intervals(x, h, w) for x in gts]
+
+    det_areas = np.array([(e - s).sum() for s, e in det_intervals], dtype=np.float64)
+    gt_areas = np.array([(e - s).sum() for s, e in gt_intervals], dtype=np.float64)
+
+    # Concatenate the intervals of every detection so each gt is intersected with all of them at once
+    owners = np.repeat(np.arange(len(dets)), [len(s) for s, _ in det_intervals])
+    starts = np.concatenate([s for s, _ in det_intervals] + [np.zeros(0, dtype=np.int64)])
+    ends = np.concatenate([e for _, e in det_intervals] + [np.zeros(0, dtype=np.int64)])
+
+    intersection = np.zeros((len(dets), len(gts)))
+    for idx, (gt_starts, gt_ends) in enumerate(gt_intervals):
+        if len(gt_starts) == 0 or len(starts) == 0:
+            continue
+
+        overlap = _coverage(gt_starts, gt_ends, ends) - _coverage(gt_starts, gt_ends, starts)
+        intersection[:, idx] = np.bincount(owners, weights=overlap, minlength=len(dets))
+
+    union = det_areas[:, None] + gt_areas[None, :] - intersection
+    if iscrowd is not None:
+        crowd = np.asarray(iscrowd, dtype=bool)
+        union[:, crowd] = det_areas[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, intersection / union, 0)
@@ -0,0 +1,104 @@
+""" Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
+
+import numpy as np
+
+
+def _candidates(iou: np.ndarray, pred_classes: np.ndarray, gt_classes: np.ndarray, thresh: float) -> tuple:
+    """
+    Returns the (pred, gt, iou) pairs that could be matched at thresh, in the order greedy matching tries them:
+    by prediction, then from the highest IoU to the lowest (ties going to the lowest gt index).
+    """
+    # A gt can only be taken by a prediction of its own class, so every class is a separate problem
+    # and only pairs within a class that overlap enough can ever be matched.
+    possible = (iou >= thresh) & (pred_classes[:, None] == gt_classes[None, :])
+
+    pred_idx, gt_idx = np.nonzero(possible)
+    pair_iou = iou[pred_idx, gt_idx]
+
+    order = np.lexsort((gt_idx, -pair_iou, pred_idx))
+    return pred_idx[order], gt_idx[order], pair_iou[order]
+
+
+def greedy_match(iou: np.ndarray, pred_classes: np.ndarray, gt_classes: np.ndarray, thresh: float) -> tuple:
+    """
+    Greedily matches predictions (sorted by descending score) to gt of the same class, where each prediction
+    takes the unused gt it has the highest IoU with if that IoU is at least thresh.
+
+    Only the pairs that overlap enough are looked at, so the cost depends on the number of real overlaps
+    instead of the size of the (N, M) IoU matrix. Returns an (N,) array with the gt index each prediction
+    was matched with and an (M,) array with the prediction index each gt was matched with, or -1 for neither.
+    """
+    pred_idx, gt_idx, _ = _candidates(iou, pred_classes, gt_classes, thresh)
+    return _greedy(pred_idx.tolist(), gt_idx.tolist(), *iou.shape)
+
+
+def greedy_match_thresholds(
+    iou: np.ndarray, pred_classes: np.ndarray, gt_classes: np.ndarray, thresholds: list
+) -> tuple:
+    """
+    Does greedy_match at every threshold in one go. The candidate pairs are found and sorted once for the
+    lowest threshold, and every other threshold just drops the pairs below it from that list.
+
+    Returns a (T, N) array with the gt index each prediction was matched with at each threshold (or -1)
+    and a (T, M) boolean array of which gt got used at each threshold.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    num_preds, num_gt = iou.shape
+
+    pred_matches = np.full((len(thresholds), num_preds), -1, dtype=np.int64)
+    gt_used = np.zeros((len(thresholds), num_gt), dtype=bool)
+
+    if len(thresholds) == 0:
+        return pred_matches, gt_used
+
+    pred_idx, gt_idx, pair_iou = _candidates(iou, pred_classes, gt_classes, thresholds.min())
+    last = None
+
+    for t, thresh in enumerate(thresholds):
+        keep = pair_iou >= thresh
+        num_kept = int(keep.sum())
+
+        # If no pairs dropped out since the last threshold, the matching is the same
+        if last is not None and last[1] == num_kept:
+            pred_matches[t] = pred_matches[last[0]]
+        else:
+            pred_matches[t] = _greedy(
+                pred_idx[keep].tolist(), gt_idx[keep].tolist(), num_preds, num_gt
+            )[0]
+        last = (t, num_kept)
+
+        matched = pred_matches[t][pred_matches[t] >= 0]
+        gt_used[t, matched] = True
+
+    return pred_matches, gt_used
+
+
+def best_per_group(groups: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    Returns the index of the highest scoring element of every group, where ties go to the earliest element.
+    The indices are sorted by group.
+    """
+    if len(groups) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    order = np.lexsort((np.arange(len(groups)), -scores, groups))
+    sorted_groups = groups[order]
+
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    return order[first]
+
+
+def _greedy(pred_idx: list, gt_idx: list, num_preds: int, num_gt: int) -> tuple:
+    """Matches the sorted candidate pairs one by one, skipping the ones where either side is already taken."""
+    pred_matches = [-1] * num_preds
+    gt_matches = [-1] * num_gt
+
+    for pred, gt in zip(pred_idx, gt_idx):
+        if pred_matches[pred] >= 0 or gt_matches[gt] >= 0:
+            continue
+
+        pred_matches[pred] = gt
+        gt_matches[gt] = pred
+
+    return np.array(pred_matches, dtype=np.int64), np.array(gt_matches, dtype=np.int64)
@@ -1,195 +1,254 @@
 """ Copyright (c) 2020 Daniel Bolya, based on https://github.com/dbolya/tide """
 
+import itertools
 import os
+import threading
 from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import numpy as np
 
 from . import functions as f
+from . import mask as mask_utils
 from . import plotting as P
-from .ap import ClassedAPDataObject
-from .data import Data
+from .ap import ClassedAPDataObject, CompactClassedAPDataObject, IncrementalAPData
+from .data import _NO_CLASS, AnnotationView, Data, GTIndex, ImageGT
+from .errors.error import ERROR_DTYPE, FIX_GT, FIX_REMOVE, FIX_TRUE
 from .errors.main_errors import *
-from .errors.qualifiers import Qualifier
+from .errors.qualifiers import Qualifier, make_bitmask
+from .iou import box_iou
+from .matching import best_per_group, greedy_match, greedy_match_thresholds
 
 
 class TIDEExample:
-    """Computes all the data needed to evaluate a set of predictions and gt for a single image."""
+    """
+    Computes all the data needed to evaluate a set of predictions and gt for a single image.
+
+    The score ordering and IoUs only depend on the image, so they're computed once in the
+    constructor. Use match() to redo the matching at another threshold on the same example, and
+    pass all the thresholds that will be used up front to match them all at once.
+    """
 
     def __init__(
         self,
-        preds: list,
-        gt: list,
+        preds: AnnotationView,
+        gt: ImageGT,
         pos_thresh: float,
         mode: str,
         max_dets: int,
         run_errors: bool = True,
+        thresholds: list = None,
     ):
+        # Lists of annotation dicts work too
+        if not isinstance(preds, AnnotationView):
+            preds = AnnotationView.from_list(preds)
+        if not isinstance(gt, ImageGT):
+            gt = ImageGT(gt)
+
         self.preds = preds
-        self.gt = [x for x in gt if not x["ignore"]]
-        self.ignore_regions = [x for x in gt if x["ignore"]]
+        self.image_gt = gt
+        self.gt = gt.gt
+        self.ignore_regions = gt.ignore_regions
 
         self.mode = mode
-        self.pos_thresh = pos_thresh
         self.max_dets = max_dets
-        self.run_errors = run_errors
 
-        self._run()
+        self._prepare()
+        if thresholds is not None:
+            self.match_thresholds(thresholds)
+        self.match(pos_thresh, run_errors)
 
-    def _run(self):
+    def _prepare(self):
+        """Sorts the predictions and computes everything that doesn't depend on the threshold."""
         preds = self.preds
         gt = self.gt
-        ignore = self.ignore_regions
-        det_type = "bbox" if self.mode == TIDE.BOX else "mask"
-        max_dets = self.max_dets
 
         if len(preds) == 0:
             raise RuntimeError("Example has no predictions!")
 
-        # Sort descending by score
-        preds.sort(key=lambda pred: -pred["score"])
-        preds = preds[:max_dets]
+        # Sort descending by score. Stable, so ties keep the order the predictions were added in.
+        preds = preds[np.argsort(-preds.scores, kind="stable")[: self.max_dets]]
         self.preds = preds  # Update internally so TIDERun can update itself if :max_dets takes effect
-        detections = [x[det_type] for x in preds]
-
-        def jaccard(dets, gt):
-            xa, ya, x2a, y2a = dets[0], dets[1], dets[2], dets[3]
-            xb, yb, x2b, y2b = (
-                gt["bbox"][0],
-                gt["bbox"][1],
-                gt["bbox"][2],
-                gt["bbox"][3],
-            )
-
-            # innermost left x
-            xi = max(xa, xb)
-            # innermost right x
-            x2i = min(x2a, x2b)
-            # same for y
-            yi = max(ya, yb)
-            y2i = min(y2a, y2b)
+        self.detections = preds.boxes if self.mode == TIDE.BOX else preds.masks
 
-            # calculate areas
-            Aa = max(x2a - xa, 0) * max(y2a - ya, 0)
-            Ab = max(x2b - xb, 0) * max(y2b - yb, 0)
-            Ai = max(x2i - xi, 0) * max(y2i - yi, 0)
+        # IoU is [len(detections), len(gt)]
+        if self.mode == TIDE.BOX:
+            self.gt_iou = box_iou(self.detections, gt.boxes)
+        else:
+            self.gt_iou = mask_utils.iou(self.detections, gt.masks)
+        if len(gt) > 0:
+            assert (
+                np.amin(self.gt_iou) >= 0.0
+            ), "jaccard array contains values smaller than zero!"
 
-            return Ai / (Aa + Ab - Ai)
+        self.pred_cls = pred_cls = preds.classes
+        self.gt_cls = gt_cls = self.image_gt.classes
 
-        self.gt_iou = np.ones((len(detections), len(gt))) * -1
+        self.pred_ids = preds.ids
+        self.gt_ids = self.image_gt.ids
+        self.pred_scores = preds.scores
 
-        for id_d, d in enumerate(detections):
-            for id_g, g in enumerate(gt):
-                self.gt_iou[id_d, id_g] = jaccard(d, g)
-        assert (
-            np.amin(self.gt_iou) >= 0.0
-        ), "jaccard array contains values smaller than zero!"
-
-        # IoU is [len(detections), len(gt)]
-        # self.gt_iou = mask_utils.iou(
-        # 	detections,
-        # 	[x[det_type] for x in gt],
-        # 	[False] * len(gt))
-
-        # Store whether a prediction / gt got used in their data list
-        # Note: this is set to None if ignored, keep that in mind
-        for idx, pred in enumerate(preds):
-            pred["used"] = False
-            pred["_idx"] = idx
-            pred["iou"] = 0
-        for idx, truth in enumerate(gt):
-            truth["used"] = False
-            truth["usable"] = False
-            truth["_idx"] = idx
-
-        pred_cls = np.array([x["class"] for x in preds])
-        gt_cls = np.array([x["class"] for x in gt])
+        # The best IoU of each prediction with a gt of its class
+        self.pred_iou = np.zeros(len(preds))
 
         if len(gt) > 0:
             # A[i,j] is true iff the prediction i is of the same class as gt j
             self.gt_cls_matching = pred_cls[:, None] == gt_cls[None, :]
             self.gt_cls_iou = self.gt_iou * self.gt_cls_matching
+            self.gt_noncls_iou = self.gt_iou * ~self.gt_cls_matching
+            self.pred_iou = self.gt_cls_iou.max(axis=1)
 
-            # This will be changed in the matching calculation, so make a copy
-            iou_buffer = self.gt_cls_iou.copy()
+        if len(self.ignore_regions) > 0:
+            self._prepare_ignore_regions(pred_cls)
 
-            for pred_idx, pred_elem in enumerate(preds):
-                # Find the max iou ground truth for this prediction
-                gt_idx = np.argmax(iou_buffer[pred_idx, :])
-                iou = iou_buffer[pred_idx, gt_idx]
+        # Maps a threshold to the gt index each prediction gets matched with at that threshold
+        self._threshold_matches = {}
 
-                pred_elem["iou"] = np.max(self.gt_cls_iou[pred_idx, :])
+    def match_thresholds(self, thresholds: list):
+        """Computes the matching at every threshold at once, so that match() only has to look them up."""
+        if len(self.gt) == 0:
+            return
 
-                if iou >= self.pos_thresh:
-                    gt_elem = gt[gt_idx]
+        pred_matches, _ = greedy_match_thresholds(
+            self.gt_iou, self.pred_cls, self.gt_cls, thresholds
+        )
+        for thresh, matches in zip(thresholds, pred_matches):
+            self._threshold_matches[thresh] = matches
+
+    def _prepare_ignore_regions(self, pred_cls: np.ndarray):
+        """Computes the crowd IoU between every detection and every ignore region in one matrix."""
+        regions = self.ignore_regions
+        has_box = ~np.isnan(regions.boxes[:, 0])
+        has_mask = regions.has_mask
+
+        # Regions without a box or mask span the whole image
+        whole_image = ~has_box & ~has_mask
+        # Regions without an annotation for this mode are skipped, so they keep an IoU of 0
+        annotated = np.flatnonzero(has_box if self.mode == TIDE.BOX else has_mask)
+
+        # A[i, j] is the intersection of detection i and region j over the area of detection i
+        self.ignore_iou = np.zeros((len(self.preds), len(regions)))
+        self.ignore_iou[:, whole_image] = 1
+
+        if len(annotated) > 0:
+            iscrowd = [True] * len(annotated)
+
+            if self.mode == TIDE.BOX:
+                areas = regions.boxes[annotated]
+                self.ignore_iou[:, annotated] = box_iou(self.detections, areas, iscrowd)
+            else:
+                areas = regions[annotated].masks
+                self.ignore_iou[:, annotated] = mask_utils.iou(self.detections, areas, iscrowd)
+
+        # A[i, j] is true iff region j applies to the class of prediction i (-1 applies to all classes).
+        # Class-less regions have a sentinel class that no prediction has.
+        region_cls = regions.classes
+        self.ignore_cls_matching = (pred_cls[:, None] == region_cls[None, :]) | (
+            region_cls[None, :] == -1
+        )
+
+    def match(self, pos_thresh: float, run_errors: bool = True):
+        """Greedily matches the predictions to the gt at pos_thresh, overwriting any previous match."""
+        preds = self.preds
+        gt = self.gt
+        ignore = self.ignore_regions
+
+        self.pos_thresh = pos_thresh
+        self.run_errors = run_errors
 
-                    pred_elem["used"] = True
-                    gt_elem["used"] = True
-                    pred_elem["matched_with"] = gt_elem["_id"]
-                    gt_elem["matched_with"] = pred_elem["_id"]
+        # The matching state lives in these arrays instead of the annotations, so that the same Data can be
+        # evaluated by several runs. The index of the gt each prediction got matched with and vice versa, or -1
+        self.pred_matches = np.full(len(preds), -1)
+        self.gt_matched_pred = np.full(len(gt), -1)
+        # Which predictions fell inside of an ignore region
+        self.pred_ignored = np.zeros(len(preds), dtype=bool)
 
-                    # Make sure this gt can't be used again
-                    iou_buffer[:, gt_idx] = 0
+        if len(gt) > 0:
+            pred_matches = self._threshold_matches.get(pos_thresh)
+            if pred_matches is None:
+                pred_matches, _ = greedy_match(
+                    self.gt_iou, self.pred_cls, self.gt_cls, pos_thresh
+                )
+
+            matched = np.flatnonzero(pred_matches >= 0)
+            self.pred_matches = pred_matches
+            self.gt_matched_pred[pred_matches[matched]] = matched
 
         # Ignore regions annotations allow us to ignore predictions that fall within
         if len(ignore) > 0:
-            # Because ignore regions have extra parameters, it's more efficient to use a for loop here
-            for ignore_region in ignore:
-                if ignore_region["mask"] is None and ignore_region["bbox"] is None:
-                    # The region should span the whole image
-                    ignore_iou = [1] * len(preds)
-                else:
-                    if ignore_region[det_type] is None:
-                        # There is no det_type annotation for this specific region so skip it
-                        continue
-                    # Otherwise, compute the crowd IoU between the detections and this region
-                    # ignore_iou = mask_utils.iou(detections, [ignore_region[det_type]], [True])
-                    detections = detections
-                    det_type = det_type
-                    ignore_region = ignore_region
-                    t = 1
-                    # ignore_iou =
-
-                for pred_idx, pred_elem in enumerate(preds):
-                    if (
-                        not pred_elem["used"]
-                        and (ignore_iou[pred_idx] > self.pos_thresh)
-                        and (
-                            ignore_region["class"] == pred_elem["class"]
-                            or ignore_region["class"] == -1
-                        )
-                    ):
-                        # Set the prediction to be ignored
-                        pred_elem["used"] = None
+            in_region = (self.ignore_iou > self.pos_thresh) & self.ignore_cls_matching
+            self.pred_ignored = (self.pred_matches < 0) & in_region.any(axis=1)
 
-        if len(gt) == 0:
-            # No ground truth, but we still need to process predictions as false positives
-            for pred_idx, pred in enumerate(preds):
-                pred["used"] = False
-                pred["iou"] = 0.0
-                pred["matched_with"] = None
-            return
+    def classify_errors(self, bg_thresh: float) -> tuple:
+        """
+        Decides what kind of error every prediction that isn't a true positive is, all at once.
 
-        # Some matrices used just for error calculation
-        if self.run_errors:
-            self.gt_used = np.array([x["used"] == True for x in gt])[None, :]
-            self.gt_unused = ~self.gt_used
+        Returns the indices of those predictions, their error types as indices into TIDE._error_types,
+        and the index of the gt each error is linked to, or -1. For a DuplicateError, that's the gt
+        whose matched prediction suppressed it.
+        """
+        pos_thresh = self.pos_thresh
+        error_types = TIDE._error_types
 
-            self.gt_unused_iou = self.gt_unused * self.gt_iou
-            self.gt_unused_cls = self.gt_unused_iou * self.gt_cls_matching
-            self.gt_unused_noncls = self.gt_unused_iou * ~self.gt_cls_matching
+        pred_idx = np.flatnonzero(self.pred_matches < 0)
+        codes = np.full(len(pred_idx), error_types.index(BackgroundError))
+        gt_idx = np.full(len(pred_idx), -1)
 
-            self.gt_noncls_iou = self.gt_iou * ~self.gt_cls_matching
+        if len(self.gt) == 0 or len(pred_idx) == 0:
+            # There is no ground truth for this image, so everything is a BackgroundError
+            return pred_idx, codes, gt_idx
+
+        rows = np.arange(len(pred_idx))
+
+        def best(iou: np.ndarray) -> tuple:
+            idx = iou.argmax(axis=1)
+            return idx, iou[rows, idx]
+
+        cls_iou = self.gt_cls_iou[pred_idx]
+        gt_used = self.gt_matched_pred >= 0
+
+        box_gt, box_iou = best(cls_iou)
+        cls_gt, noncls_iou = best(self.gt_noncls_iou[pred_idx])
+        dup_gt, dup_iou = best(cls_iou * gt_used[None, :])
+        _, bkg_iou = best(self.gt_iou[pred_idx])
+
+        # These are tested in order, so the first one that applies is the error type
+        is_box = (bg_thresh <= box_iou) & (box_iou <= pos_thresh)  # Would be positive with a better box
+        is_cls = noncls_iou >= pos_thresh  # Would be positive with the right class
+        is_dup = dup_iou >= pos_thresh  # Would be positive if the gt wasn't used already
+        is_bkg = bkg_iou <= bg_thresh  # Should have been background
+
+        codes = np.select(
+            [is_box, is_cls, is_dup, is_bkg],
+            [error_types.index(x) for x in (BoxError, ClassError, DuplicateError, BackgroundError)],
+            error_types.index(OtherError),
+        )
+        gt_idx = np.select([is_box, is_cls, is_dup], [box_gt, cls_gt, dup_gt], -1)
 
-            self.gt_used_iou = self.gt_used * self.gt_iou
-            self.gt_used_cls = self.gt_used_iou * self.gt_cls_matching
+        return pred_idx, codes, gt_idx
+
+
+# The gt and predictions of the run a worker process is evaluating shards for, see TIDERun._run_parallel
+_worker_data = None
+
+
+def _init_worker(gt: Data, preds: Data):
+    global _worker_data
+    _worker_data = (gt, preds)
+
+
+def _eval_shard(image_ids: list, run_args: tuple) -> tuple:
+    """Evaluates one shard of images in a worker process, returning the parts TIDERun merges."""
+    gt, preds = _worker_data
+    run = TIDERun(gt, preds, *run_args, image_ids=image_ids)
+    return run.ap_data, run.error_table, run._false_negatives
 
 
 class TIDERun:
     """Holds the data for a single run of TIDE."""
 
-    # Temporary variables stored in ground truth that we need to clear after a run
-    _temp_vars = ["best_score", "best_id", "used", "matched_with", "_idx", "usable"]
+    # Runs of consecutive images without gt or predictions at least this long are evaluated in bulk
+    _min_bulk_images = 8
 
     def __init__(
         self,
@@ -200,17 +259,41 @@ class TIDERun:
         mode: str,
         max_dets: int,
         run_errors: bool = True,
+        examples: dict = None,
+        workers: int = None,
+        image_ids: list = None,
+        thresholds: list = None,
+        gt_index: GTIndex = None,
     ):
         self.gt = gt
         self.preds = preds
 
-        self.errors = []
-        self.error_dict = {_type: [] for _type in TIDE._error_types}
+        # The gt of each image, already split and converted to arrays (this gets pickled along with gt)
+        self.gt_index = gt.get_gt_index() if gt_index is None else gt_index
+
+        # Which images to evaluate, by default every image with either gt or predictions
+        self.image_ids = image_ids
+
+        # If more than 1, images are evaluated in this many worker processes
+        self.workers = workers
+
+        # If given, TIDEExamples are cached here during the run so that other runs over the same data can reuse them
+        self.examples = examples
+        # If given, the thresholds the runs sharing those examples use, so they can all be matched at once
+        self.thresholds = thresholds
+
+        # The errors are stored as chunks of rows of an error table, see error_table
+        self._error_chunks = []
+        self._errors = None
+
         self.ap_data = ClassedAPDataObject()
         self.qualifiers = {}
 
-        # A list of false negatives per class
-        self.false_negatives = {_id: [] for _id in self.gt.classes}
+        # Built the first time errors are fixed, see _get_ap_fixer
+        self._ap_fixer = None
+
+        # The ids of the false negative gt of each class, see false_negatives
+        self._false_negatives = {_id: [] for _id in self.gt.classes}
 
         self.pos_thresh = pos_thresh
         self.bg_thresh = bg_thresh
@@ -220,30 +303,41 @@ class TIDERun:
 
         self._run()
 
+        # The examples hold every image's IoU matrices, so don't keep them alive once the run is done
+        self.examples = None
+
     def _run(self):
         """And awaaay we go"""
 
         # Process all images that have either ground truth or predictions
-        all_image_ids = set(self.gt.images.keys()).union(set(self.preds.images.keys()))
-        
-        for image in all_image_ids:
-            x = self.preds.get(image)
-            y = self.gt.get(image)
-
-            # These classes are ignored for the whole image and not in the ground truth, so
-            # we can safely just remove these detections from the predictions at the start.
-            # However, since ignored detections are still used for error calculations, we have to keep them.
-            if not self.run_errors:
-                ignored_classes = self.gt._get_ignored_classes(image)
-                x = [pred for pred in x if pred["class"] not in ignored_classes]
-
-            self._eval_image(x, y)
-
-        # Store a fixed version of all the errors for testing purposes
-        for error in self.errors:
-            error.original = f.nonepack(error.unfix())
-            error.fixed = f.nonepack(error.fix())
-            error.disabled = False
+        if self.image_ids is None:
+            self.image_ids = list(
+                set(self.gt.image_ids).union(set(self.preds.image_ids))
+            )
+
+        # There's nothing to split up with fewer than two images
+        if self.workers is not None and self.workers > 1 and len(self.image_ids) > 1:
+            self._run_parallel()
+        else:
+            pred_offsets = self.preds._get_index()[0]
+            gt_images = self.gt_index.images
+
+            # Images without gt or without predictions are collected and done in bulk
+            empty_images = []
+
+            for image in self.image_ids:
+                if image in pred_offsets and image in gt_images:
+                    # Keep everything in image order
+                    if len(empty_images) > 0:
+                        self._eval_empty_images(empty_images)
+                        empty_images = []
+
+                    self._eval_image_id(image)
+                else:
+                    empty_images.append(image)
+
+            if len(empty_images) > 0:
+                self._eval_empty_images(empty_images)
 
         # Analyze TIDE errors
         analyze_errors = False
@@ -260,7 +354,7 @@ class TIDERun:
                     )
                 else:
                     e.write(
-                        f'{error.pred["image"]}: ERROR={error.short_name} with score={error.pred["score"]:.4f} and IoU={error.pred["iou"]}, class={error.pred["class"]}\n'
+                        f'{error.pred["image"]}: ERROR={error.short_name} with score={error.pred["score"]:.4f} and IoU={error._data["iou"]}, class={error.pred["class"]}\n'
                     )
             e.close()
 
@@ -337,134 +431,367 @@ class TIDERun:
 
         self.ap = self.ap_data.get_mAP()
 
-        # Now that we've stored the fixed errors, we can clear the gt info
-        self._clear()
+    def _eval_image_id(self, image: int):
+        x = self.preds.get(image)
+        y = self.gt_index.get(image)
+
+        # These classes are ignored for the whole image and not in the ground truth, so
+        # we can safely just remove these detections from the predictions at the start.
+        # However, since ignored detections are still used for error calculations, we have to keep them.
+        filtered = False
+        if not self.run_errors:
+            ignored_classes = y.ignored_classes
+            if len(ignored_classes) > 0:
+                x = x[~np.isin(x.classes, list(ignored_classes))]
+                filtered = True
+
+        self._eval_image(x, y, (image, filtered))
+
+    def _eval_empty_images(self, images: list):
+        """
+        Evaluates images that have no gt or no predictions (but not both) all at once. Every prediction in
+        those is a false positive and a BackgroundError, and every gt is a false negative and a MissedError.
+
+        The result is the same as calling _eval_image_id on each image in order.
+        """
+        # Doing them in bulk has some overhead, so just a few images are quicker one at a time
+        if len(images) < self._min_bulk_images:
+            for image in images:
+                self._eval_image_id(image)
+            return
+
+        pred_offsets, pred_ids, pred_classes, pred_scores, _, _ = self.preds._get_index()
+        gt_offsets, gt_ids, gt_classes, _, _, gt_ignore = self.gt._get_index()
+        num_pred_rows = len(pred_ids)
+
+        # The rows of the predictions and gt stacked on top of each other, with each image's slice into them
+        slices = [
+            pred_offsets[x] if x in pred_offsets else np.add(gt_offsets[x], num_pred_rows)
+            for x in images
+            if x in pred_offsets or x in gt_offsets
+        ]
+        if len(slices) == 0:
+            return
+
+        starts, ends = np.array(slices, dtype=np.int64).reshape(-1, 2).T
+        lengths = ends - starts
+        rows = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+
+        is_pred = rows < num_pred_rows
+        pred_rows = rows[is_pred]
+        gt_rows = rows[~is_pred] - num_pred_rows
 
-    def _clear(self):
-        """Clears the ground truth so that it's ready for another run."""
-        for gt in self.gt.annotations:
-            for var in self._temp_vars:
-                if var in gt:
-                    del gt[var]
+        ids = np.empty(len(rows), dtype=np.int64)
+        classes = np.empty(len(rows), dtype=np.int64)
+        scores = np.full(len(rows), np.nan)
 
-    def _add_error(self, error):
-        self.errors.append(error)
-        self.error_dict[type(error)].append(error)
+        ids[is_pred], ids[~is_pred] = pred_ids[pred_rows], gt_ids[gt_rows]
+        classes[is_pred], classes[~is_pred] = pred_classes[pred_rows], gt_classes[gt_rows]
+        scores[is_pred] = pred_scores[pred_rows]
 
-    def _eval_image(self, preds: list, gt: list):
+        # Ignore regions don't count for anything when there are no predictions
+        keep = np.ones(len(rows), dtype=bool)
+        keep[~is_pred] = ~gt_ignore[gt_rows]
 
-        for truth in gt:
-            if not truth["ignore"]:
-                self.ap_data.add_gt_positives(truth["class"], 1)
+        is_pred, ids, classes, scores = is_pred[keep], ids[keep], classes[keep], scores[keep]
+
+        # Go through the classes in the order they'd first be seen image by image
+        unique_classes, first = np.unique(classes, return_index=True)
+        for _cls in unique_classes[np.argsort(first, kind="stable")].tolist():
+            in_class = classes == _cls
+            obj = self.ap_data.objs[_cls]
+
+            is_gt = in_class & ~is_pred
+            if is_gt.any():
+                obj.add_gt_positives(int(is_gt.sum()))
+                obj.push_false_negatives(ids[is_gt].tolist())
+
+            in_class &= is_pred
+            if in_class.any():
+                obj.push_many(
+                    ids[in_class].tolist(), scores[in_class].tolist(), False, {"iou": 0.0, "used": False}
+                )
+
+        if not self.run_errors:
+            return
+
+        self._add_false_negatives(ids[~is_pred], classes[~is_pred])
+
+        self._add_errors(
+            len(ids),
+            {
+                "type": np.where(
+                    is_pred,
+                    TIDE._error_types.index(BackgroundError),
+                    TIDE._error_types.index(MissedError),
+                ),
+                "pred": np.where(is_pred, ids, -1),
+                "gt": np.where(is_pred, -1, ids),
+                "class": classes,
+                "score": scores,
+                "fixed_class": classes,
+                "fixed": np.where(is_pred, FIX_REMOVE, FIX_GT),
+            },
+        )
+
+    def _run_parallel(self):
+        """Evaluates contiguous shards of the images in a process pool and merges them back in order."""
+        # A few shards per worker evens out the load if some images are much slower than others
+        num_shards = min(len(self.image_ids), self.workers * 4)
+        bounds = [len(self.image_ids) * i // num_shards for i in range(num_shards + 1)]
+        shards = [self.image_ids[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+        run_args = (
+            self.pos_thresh,
+            self.bg_thresh,
+            self.mode,
+            self.max_dets,
+            self.run_errors,
+        )
+
+        with ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.gt, self.preds)
+        ) as pool:
+            # Map returns the results in order, so merging gives the same result as running serially
+            for ap_data, error_table, false_negatives in pool.map(
+                _eval_shard, shards, itertools.repeat(run_args)
+            ):
+                self.ap_data.extend(ap_data)
+                self._error_chunks.append(error_table)
+
+                for _cls, gt_ids in false_negatives.items():
+                    self._false_negatives[_cls].extend(gt_ids)
+
+    @property
+    def error_table(self) -> np.ndarray:
+        """A structured array of ERROR_DTYPE with one row per error, in the order they were found."""
+        if len(self._error_chunks) != 1:
+            self._error_chunks = [np.concatenate([np.zeros(0, ERROR_DTYPE)] + self._error_chunks)]
+        return self._error_chunks[0]
+
+    @property
+    def errors(self) -> list:
+        """The errors of this run as Error objects, which are views of the error table created on first access."""
+        table = self.error_table
+        errors = [] if self._errors is None else self._errors
+
+        for row, error_type in enumerate(table["type"][len(errors) :].tolist(), len(errors)):
+            errors.append(TIDE._error_types[error_type](self, row))
+
+        self._errors = errors
+        return errors
+
+    @property
+    def error_dict(self) -> dict:
+        """The errors of this run, grouped by type."""
+        error_dict = {_type: [] for _type in TIDE._error_types}
+        for error in self.errors:
+            error_dict[type(error)].append(error)
+        return error_dict
+
+    def _get_pred(self, _id: int) -> dict:
+        return self.preds.annotations[_id]
+
+    def _get_gt(self, _id: int) -> dict:
+        return self.gt.annotations[_id]
+
+    def _add_errors(self, num: int, columns: dict):
+        """Appends num rows to the error table, where columns maps a column name to its values for these rows."""
+        rows = np.zeros(num, dtype=ERROR_DTYPE)
+        rows["pred"] = rows["gt"] = rows["suppressor"] = -1
+        rows["score"] = np.nan
+
+        for name, values in columns.items():
+            rows[name] = values
+
+        self._error_chunks.append(rows)
+
+    def _add_missed_errors(self, ids: np.ndarray, classes: np.ndarray):
+        """Adds a MissedError for every gt id in ids, which is fixed by no longer counting that gt."""
+        self._add_errors(
+            len(ids),
+            {
+                "type": TIDE._error_types.index(MissedError),
+                "gt": ids,
+                "class": classes,
+                "fixed_class": classes,
+                "fixed": FIX_GT,
+            },
+        )
+
+    def _add_false_negatives(self, ids: np.ndarray, classes: np.ndarray):
+        """Records the gt with these ids and classes as false negatives."""
+        for _id, _cls in zip(ids.tolist(), classes.tolist()):
+            self._false_negatives[_cls].append(_id)
+
+    @property
+    def false_negatives(self) -> dict:
+        """The annotation dicts of the false negative gt of each class, created on access."""
+        return {
+            _cls: [self._get_gt(x) for x in ids] for _cls, ids in self._false_negatives.items()
+        }
+
+    @property
+    def false_negative_counts(self) -> dict:
+        """The number of false negative gt of each class."""
+        return {_cls: len(ids) for _cls, ids in self._false_negatives.items()}
+
+    def _eval_image(self, preds: AnnotationView, gt: ImageGT, example_key: tuple = None):
+        """
+        Evaluates the predictions of one image against its gt. Both can also be lists of annotation dicts,
+        but the columns of the views are all that's read.
+        """
+        if not isinstance(preds, AnnotationView):
+            preds = AnnotationView.from_list(preds)
+        if not isinstance(gt, ImageGT):
+            gt = ImageGT(gt)
+
+        for _cls, num_positives in gt.positives.items():
+            self.ap_data.add_gt_positives(_cls, num_positives)
 
         if len(preds) == 0:
             # There are no predictions for this image so add all gt as missed
-            for truth in gt:
-                if not truth["ignore"]:
-                    self.ap_data.push_false_negative(truth["class"], truth["_id"])
+            self.ap_data.push_false_negatives(gt.classes, gt.ids)
 
-                    if self.run_errors:
-                        self._add_error(MissedError(truth))
-                        self.false_negatives[truth["class"]].append(truth)
+            if self.run_errors and len(gt.ids) > 0:
+                self._add_false_negatives(gt.ids, gt.classes)
+                self._add_missed_errors(gt.ids, gt.classes)
             return
 
         # Handle case where there are predictions but no ground truth
         if len(gt) == 0:
             # All predictions are false positives when there's no ground truth
-            for pred in preds:
-                pred["used"] = False
-                pred["iou"] = 0.0
-                pred["matched_with"] = None
-                pred["info"] = {"iou": 0.0, "used": False}
-                
-                self.ap_data.push(
-                    pred["class"],
-                    pred["_id"], 
-                    pred["score"],
-                    False,  # This is a false positive
-                    pred["info"],
+            num_preds = len(preds)
+            self.ap_data.push_arrays(
+                preds.classes,
+                preds.ids,
+                preds.scores,
+                np.zeros(num_preds, dtype=bool),
+                np.zeros(num_preds),
+                np.full(num_preds, -1, dtype=np.int64),
+            )
+
+            if self.run_errors:
+                # All predictions are background errors when there's no GT
+                self._add_errors(
+                    len(preds),
+                    {
+                        "type": TIDE._error_types.index(BackgroundError),
+                        "pred": preds.ids,
+                        "class": preds.classes,
+                        "score": preds.scores,
+                        "fixed_class": preds.classes,
+                    },
                 )
-                
-                if self.run_errors:
-                    # All predictions are background errors when there's no GT
-                    self._add_error(BackgroundError(pred))
             return
 
-        ex = TIDEExample(
-            preds, gt, self.pos_thresh, self.mode, self.max_dets, self.run_errors
+        ex = self.examples.get(example_key) if self.examples is not None else None
+
+        if ex is None:
+            ex = TIDEExample(
+                preds,
+                gt,
+                self.pos_thresh,
+                self.mode,
+                self.max_dets,
+                self.run_errors,
+                self.thresholds,
+            )
+            if self.examples is not None:
+                self.examples[example_key] = ex
+        else:
+            # The IoUs were already computed by another run, so just redo the matching
+            ex.match(self.pos_thresh, self.run_errors)
+        # The example's predictions are sorted and restricted to the max. Ignored ones don't count towards AP.
+        counted = ~ex.pred_ignored
+        used = ex.pred_matches >= 0
+        matched_with = np.full(len(used), -1, dtype=np.int64)
+        matched_with[used] = ex.gt_ids[ex.pred_matches[used]]
+
+        self.ap_data.push_arrays(
+            ex.pred_cls[counted],
+            ex.pred_ids[counted],
+            ex.pred_scores[counted],
+            used[counted],
+            ex.pred_iou[counted],
+            matched_with[counted],
         )
-        preds = ex.preds  # In case the number of predictions was restricted to the max
 
-        for pred_idx, pred in enumerate(preds):
+        # ----- ERROR DETECTION ------ #
+        # Every prediction that's negative (or ignored) is some kind of error, let's find out why
+        usable = np.zeros(len(ex.gt), dtype=bool)
+        if self.run_errors:
+            usable = self._add_pred_errors(ex)
 
-            pred["info"] = {"iou": pred["iou"], "used": pred["used"]}
-            if pred["used"]:
-                pred["info"]["matched_with"] = pred["matched_with"]
+        # If the GT wasn't used in matching, meaning it's some kind of false negative
+        unmatched = np.flatnonzero(ex.gt_matched_pred < 0)
+        self.ap_data.push_false_negatives(ex.gt_cls[unmatched], ex.gt_ids[unmatched])
 
-            if pred["used"] is not None:
-                self.ap_data.push(
-                    pred["class"],
-                    pred["_id"],
-                    pred["score"],
-                    pred["used"],
-                    pred["info"],
-                )
+        if self.run_errors and len(unmatched) > 0:
+            self._add_false_negatives(ex.gt_ids[unmatched], ex.gt_cls[unmatched])
 
-            # ----- ERROR DETECTION ------ #
-            # This prediction is a negative (or ignored), let's find out why
-            if self.run_errors and (pred["used"] == False or pred["used"] == None):
-                # Test for BackgroundError
-                if (
-                    len(ex.gt) == 0
-                ):  # Note this is ex.gt because it doesn't include ignore annotations
-                    # There is no ground truth for this image, so just mark everything as BackgroundError
-                    self._add_error(BackgroundError(pred))
-                    continue
-
-                # Test for BoxError
-                idx = ex.gt_cls_iou[pred_idx, :].argmax()
-                if self.bg_thresh <= ex.gt_cls_iou[pred_idx, idx] <= self.pos_thresh:
-                    # This detection would have been positive if it had higher IoU with this GT
-                    self._add_error(BoxError(pred, ex.gt[idx], ex))
-                    continue
-
-                # Test for ClassError
-                idx = ex.gt_noncls_iou[pred_idx, :].argmax()
-                if ex.gt_noncls_iou[pred_idx, idx] >= self.pos_thresh:
-                    # This detection would have been a positive if it was the correct class
-                    self._add_error(ClassError(pred, ex.gt[idx], ex))
-                    continue
-
-                # Test for DuplicateError
-                idx = ex.gt_used_cls[pred_idx, :].argmax()
-                if ex.gt_used_cls[pred_idx, idx] >= self.pos_thresh:
-                    # The detection would have been marked positive but the GT was already in use
-                    suppressor = self.preds.annotations[ex.gt[idx]["matched_with"]]
-                    self._add_error(DuplicateError(pred, suppressor))
-                    continue
-
-                # Test for BackgroundError
-                idx = ex.gt_iou[pred_idx, :].argmax()
-                if ex.gt_iou[pred_idx, idx] <= self.bg_thresh:
-                    # This should have been marked as background
-                    self._add_error(BackgroundError(pred))
-                    continue
-
-                # A base case to catch uncaught errors
-                self._add_error(OtherError(pred))
-
-        for truth in gt:
-            # If the GT wasn't used in matching, meaning it's some kind of false negative
-            if not truth["ignore"] and not truth["used"]:
-                self.ap_data.push_false_negative(truth["class"], truth["_id"])
-
-                if self.run_errors:
-                    self.false_negatives[truth["class"]].append(truth)
-
-                    # The GT was completely missed, no error can correct it
-                    # Note: 'usable' is set in error.py
-                    if not truth["usable"]:
-                        self._add_error(MissedError(truth))
+            # The GT was completely missed, no error can correct it
+            missed = unmatched[~usable[unmatched]]
+            if len(missed) > 0:
+                self._add_missed_errors(ex.gt_ids[missed], ex.gt_cls[missed])
+
+    def _add_pred_errors(self, ex: TIDEExample) -> np.ndarray:
+        """
+        Classifies the negative predictions of an example and adds them to the error table.
+        Returns which gt can be fixed by one of these errors.
+        """
+        error_preds, error_types, error_gt = ex.classify_errors(self.bg_thresh)
+        num_errors = len(error_preds)
+
+        cls_code = TIDE._error_types.index(ClassError)
+        box_code = TIDE._error_types.index(BoxError)
+        dupe_code = TIDE._error_types.index(DuplicateError)
+
+        # Class errors are fixed by changing to the class of their gt, everything else keeps its class
+        fixed_classes = ex.pred_cls[error_preds].astype(np.int64)
+        fixed = np.full(num_errors, FIX_REMOVE, dtype=np.int8)
+
+        is_cls = error_types == cls_code
+        fixed_classes[is_cls] = ex.gt_cls[error_gt[is_cls]]
+
+        # Class and Box errors are fixed by turning them into a true positive for their gt, but a gt can
+        # only be fixed once. So only the highest scoring error of each unused gt gets fixed, and the
+        # others get suppressed.
+        fixable = np.flatnonzero((is_cls | (error_types == box_code)) & (error_gt >= 0))
+        fixable = fixable[ex.gt_matched_pred[error_gt[fixable]] < 0]
+
+        best = fixable[best_per_group(error_gt[fixable], ex.pred_scores[error_preds[fixable]])]
+        fixed[best] = FIX_TRUE
+
+        usable = np.zeros(len(ex.gt), dtype=bool)
+        usable[error_gt[fixable]] = True
+
+        linked = error_gt >= 0
+        gt_ids = np.full(num_errors, -1, dtype=np.int64)
+        gt_ids[linked] = ex.gt_ids[error_gt[linked]]
+
+        # The suppressor of a DuplicateError is the prediction that got matched with its gt
+        dupes = error_types == dupe_code
+        suppressors = np.full(num_errors, -1, dtype=np.int64)
+        suppressors[dupes] = ex.pred_ids[ex.gt_matched_pred[error_gt[dupes]]]
+
+        self._add_errors(
+            num_errors,
+            {
+                "type": error_types,
+                "pred": ex.pred_ids[error_preds],
+                "gt": gt_ids,
+                "suppressor": suppressors,
+                "class": ex.pred_cls[error_preds],
+                "score": ex.pred_scores[error_preds],
+                "iou": ex.pred_iou[error_preds],
+                "ignored": ex.pred_ignored[error_preds],
+                "fixed_class": fixed_classes,
+                "fixed": fixed,
+            },
+        )
+
+        return usable
 
     def fix_errors(
         self,
@@ -528,7 +855,11 @@ class TIDERun:
         error_types: list = None,
         qual: Qualifier = None,
     ) -> dict:
-        ap_data = self.ap_data
+        """
+        Returns { error_type: dAP } for fixing the errors of each type (that pass qual, if given).
+        With progressive=True, the errors of each type are fixed on top of the errors of the types before
+        it, so every dAP is measured from the mAP of the step before instead of from the original mAP.
+        """
         last_ap = self.ap
 
         if qual is None:
@@ -537,60 +868,194 @@ class TIDERun:
         if error_types is None:
             error_types = TIDE._error_types
 
-        errors = {}
-
+        fixed = []
         for error in error_types:
-            _ap_data = self.fix_errors(
-                qual._make_error_func(error),
-                ap_data=ap_data,
-                disable_errors=progressive,
-            )
+            if qual.test is None:
+                fixed.append(self.error_table["type"] == TIDE._error_types.index(error))
+            else:
+                condition = qual._make_error_func(error)
+                fixed.append(
+                    np.fromiter(
+                        (condition(x) for x in self.errors),
+                        dtype=bool,
+                        count=len(self.errors),
+                    )
+                )
 
-            new_ap = _ap_data.get_mAP()
+        # Swap the fixed data points into the precomputed AP state, which only
+        # recomputes the AP of the classes that are touched by these errors.
+        ap_fixer = self._get_ap_fixer()
+        if progressive:
+            new_aps = ap_fixer.get_progressive_mAPs(fixed)
+        else:
+            new_aps = [ap_fixer.get_mAP(x) for x in fixed]
+
+        errors = {}
+
+        for error, new_ap in zip(error_types, new_aps):
             # If an error is negative that means it's likely due to binning differences, so just
             # Ignore the negative by setting it to 0.
             errors[error] = max(new_ap - last_ap, 0)
 
             if progressive:
                 last_ap = new_ap
-                ap_data = _ap_data
 
-        if progressive:
-            for error in self.errors:
-                error.disabled = False
+        return errors
+
+    def fix_qualified_errors(
+        self,
+        quals: list,
+        error_types: list = None,
+        pred_bitmask: np.ndarray = None,
+        gt_bitmask: np.ndarray = None,
+    ) -> dict:
+        """
+        Computes the main errors within every qualifier in quals, i.e., the dAP of fixing only the errors of
+        a type that pass that qualifier. This is the same as fix_main_errors(qual=q) for every q, but the
+        qualifiers are tested on the whole error table at once. The bitmasks of make_bitmask(quals) for
+        the predictions and gt can be given if they're already known.
+
+        Returns { qualifier: { error_type: dAP } }.
+        """
+        if error_types is None:
+            error_types = TIDE._error_types
+
+        error_bitmask = self._get_error_bitmask(quals, pred_bitmask, gt_bitmask)
+        error_codes = self.error_table["type"]
+        ap_fixer = self._get_ap_fixer()
+
+        errors = {}
+        for bit, qual in enumerate(quals):
+            in_qual = (error_bitmask & np.uint64(1 << bit)) > 0
+
+            errors[qual] = {
+                # Negative dAPs are ignored like in fix_main_errors
+                error: max(
+                    ap_fixer.get_mAP(in_qual & (error_codes == TIDE._error_types.index(error)))
+                    - self.ap,
+                    0,
+                )
+                for error in error_types
+            }
 
         return errors
 
+    def _get_error_bitmask(
+        self, quals: list, pred_bitmask: np.ndarray = None, gt_bitmask: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Returns a bitmask like make_bitmask for every row of the error table. Like Qualifier._make_error_func,
+        errors that have a gt are tested on their gt and the others on their prediction.
+        """
+        if pred_bitmask is None:
+            pred_bitmask = make_bitmask(self.preds, quals)
+        if gt_bitmask is None:
+            gt_bitmask = make_bitmask(self.gt, quals)
+
+        table = self.error_table
+        on_gt = np.array([hasattr(x, "gt") for x in TIDE._error_types])[table["type"]]
+
+        error_bitmask = np.zeros(len(table), dtype=np.uint64)
+        error_bitmask[on_gt] = gt_bitmask[table["gt"][on_gt]]
+        error_bitmask[~on_gt] = pred_bitmask[table["pred"][~on_gt]]
+        return error_bitmask
+
     def fix_special_errors(self, qual=None) -> dict:
+        ap_fixer = self._get_ap_fixer()
+        false_neg_offsets = {k: -v for k, v in self.false_negative_counts.items()}
+
         return {
-            FalsePositiveError: self.fix_errors(
-                transform=FalsePositiveError.fix
-            ).get_mAP()
-            - self.ap,
-            FalseNegativeError: self.fix_errors(
-                false_neg_dict=self.false_negatives
-            ).get_mAP()
+            FalsePositiveError: ap_fixer.get_mAP(true_first=True) - self.ap,
+            FalseNegativeError: ap_fixer.get_mAP(gt_offsets=false_neg_offsets)
             - self.ap,
         }
 
+    def _get_ap_fixer(self) -> IncrementalAPData:
+        """
+        Returns the incremental AP state with the original and fixed data points of every error, building it once.
+        Data points are added in the same order that fix_errors pushes them in, so that both give the same mAP.
+        """
+        if self._ap_fixer is None:
+            table = self.error_table
+            num_errors = len(table)
+
+            # Interleave every error's original data point with its fixed one, skipping the ones it doesn't have
+            has_point = np.stack(
+                [(table["pred"] >= 0) & ~table["ignored"], table["fixed"] == FIX_TRUE], axis=1
+            ).ravel()
+
+            classes = np.stack([table["class"], table["fixed_class"]], axis=1).ravel()[has_point]
+            scores = np.repeat(table["score"], 2)[has_point]
+            is_fix = np.tile([False, True], num_errors)[has_point]
+            owners = np.repeat(np.arange(num_errors), 2)[has_point]
+
+            # Specific for MissingError (or anything else that affects #GT)
+            gt_owners = np.flatnonzero(table["fixed"] == FIX_GT)
+
+            # The true positives stay the same no matter which errors get fixed
+            true_classes, true_scores = [], []
+            for _cls, obj in self.ap_data.objs.items():
+                # Sorted, but true positives with the same score are interchangeable
+                point_scores, is_true = obj._get_sorted()[:2]
+                true_classes += [_cls] * int(is_true.sum())
+                true_scores.append(point_scores[is_true])
+
+            self._ap_fixer = IncrementalAPData(
+                self.ap_data.get_gt_positives(),
+                classes.tolist() + true_classes,
+                np.concatenate([scores] + true_scores),
+                np.concatenate([is_fix, np.ones(len(true_classes), dtype=bool)]),
+                np.concatenate([owners, np.full(len(true_classes), -1)]),
+                np.concatenate([is_fix, np.zeros(len(true_classes), dtype=bool)]),
+                gt_owners,
+                table["fixed_class"][gt_owners].tolist(),
+                np.full(len(gt_owners), -1),
+            )
+
+        return self._ap_fixer
+
     def apply_qualifier(self, qualifier: Qualifier) -> ClassedAPDataObject:
         """Applies a qualifier lambda to the AP object for this runs and stores the result in self.qualifiers."""
+        pred_mask, gt_mask = self._get_qualifier_masks(qualifier)
 
-        pred_keep = defaultdict(lambda: set())
-        gt_keep = defaultdict(lambda: set())
+        pred_keep = defaultdict(set)
+        gt_keep = defaultdict(set)
 
-        for pred in self.preds.annotations:
-            if qualifier.test(pred):
-                pred_keep[pred["class"]].add(pred["_id"])
-
-        for gt in self.gt.annotations:
-            if not gt["ignore"] and qualifier.test(gt):
-                gt_keep[gt["class"]].add(gt["_id"])
+        for keep, data, mask in ((pred_keep, self.preds, pred_mask), (gt_keep, self.gt, gt_mask)):
+            ids = np.flatnonzero(mask)
+            for _id, _cls in zip(ids.tolist(), data._class_ids[ids].tolist()):
+                keep[_cls].add(_id)
 
         new_ap_data = self.ap_data.apply_qualifier(pred_keep, gt_keep)
         self.qualifiers[qualifier.name] = new_ap_data.get_mAP()
         return new_ap_data
 
+    def get_qualified_mAP(
+        self, qualifier: Qualifier, pred_mask: np.ndarray = None, gt_mask: np.ndarray = None
+    ) -> float:
+        """
+        The same as apply_qualifier(qualifier).get_mAP() (and it also stores the mAP in self.qualifiers), but
+        the AP data is filtered in place instead of copied. pred_mask and gt_mask can be given if it's already
+        known which annotation ids qualify, see make_bitmask.
+        """
+        pred_mask, gt_mask = self._get_qualifier_masks(qualifier, pred_mask, gt_mask)
+
+        qualified_ap = self.ap_data.get_qualified_mAP(pred_mask, gt_mask)
+        self.qualifiers[qualifier.name] = qualified_ap
+        return qualified_ap
+
+    def _get_qualifier_masks(
+        self, qualifier: Qualifier, pred_mask: np.ndarray = None, gt_mask: np.ndarray = None
+    ) -> tuple:
+        """Returns boolean arrays indexed by annotation id of the predictions and gt that pass qualifier."""
+        if pred_mask is None:
+            pred_mask = qualifier.test_all(self.preds)
+        if gt_mask is None:
+            gt_mask = qualifier.test_all(self.gt)
+
+        # Ignore regions are never counted as gt
+        return pred_mask, gt_mask & ~self.gt._ignore[: self.gt._num_anns]
+
 
 class TIDE:
     """
@@ -637,11 +1102,16 @@ class TIDE:
 
         self.runs = {}
         self.run_thresholds = {}
+
+        # Memoized errors of each run, see _get_errors
         self.run_main_errors = {}
         self.run_special_errors = {}
 
         self.qualifiers = OrderedDict()
 
+        # evaluate() can be called from several threads at once, which only share the registered runs
+        self._lock = threading.Lock()
+
         # self.plotter = P.Plotter()
 
     def evaluate(
@@ -653,6 +1123,36 @@ class TIDE:
         mode: str = None,
         name: str = None,
         use_for_errors: bool = True,
+        workers: int = None,
+    ) -> TIDERun:
+        """
+        Evaluates preds against gt and returns the resulting TIDERun.
+        Set workers to evaluate the images in that many processes, which gives the same result as one process.
+        """
+        return self._evaluate(
+            gt,
+            preds,
+            pos_threshold,
+            background_threshold,
+            mode,
+            name,
+            use_for_errors,
+            workers=workers,
+        )
+
+    def _evaluate(
+        self,
+        gt: Data,
+        preds: Data,
+        pos_threshold: float = None,
+        background_threshold: float = None,
+        mode: str = None,
+        name: str = None,
+        use_for_errors: bool = True,
+        examples: dict = None,
+        workers: int = None,
+        thresholds: list = None,
+        gt_index: GTIndex = None,
     ) -> TIDERun:
         pos_thresh = self.pos_thresh if pos_threshold is None else pos_threshold
         bg_thresh = (
@@ -662,12 +1162,113 @@ class TIDE:
         name = preds.name if name is None else name
 
         run = TIDERun(
-            gt, preds, pos_thresh, bg_thresh, mode, gt.max_dets, use_for_errors
+            gt,
+            preds,
+            pos_thresh,
+            bg_thresh,
+            mode,
+            gt.max_dets,
+            use_for_errors,
+            examples=examples,
+            workers=workers,
+            thresholds=thresholds,
+            gt_index=gt_index,
         )
 
         if use_for_errors:
+            self._register_run(name, run)
+
+        return run
+
+    def _register_run(self, name: str, run: TIDERun):
+        """Stores run under name, forgetting any errors memoized for a previous run with that name."""
+        with self._lock:
             self.runs[name] = run
+            self.run_main_errors.pop(name, None)
+            self.run_special_errors.pop(name, None)
+
+    def _get_errors(self, memo: dict, run_name: str, run: TIDERun, key: tuple, compute) -> dict:
+        """Returns a copy of the errors memoized in memo for run_name and key, or computes them with compute()."""
+        # A stream's errors change every time an image is added to it
+        if isinstance(run, TIDEStream):
+            return compute()
+
+        errors = memo.get(run_name, {}).get(key)
+        if errors is None:
+            errors = compute()
 
+            with self._lock:
+                # Unless the run got replaced in the meantime
+                if self.runs.get(run_name) is run:
+                    memo.setdefault(run_name, {})[key] = errors
+
+        # A copy, so that callers can't change what later calls get
+        return dict(errors)
+
+    def evaluate_many(
+        self,
+        gt: Data,
+        preds: list,
+        pos_threshold: float = None,
+        background_threshold: float = None,
+        mode: str = None,
+        names: list = None,
+        use_for_errors: bool = True,
+        workers: int = None,
+    ) -> list:
+        """
+        Evaluates every Data object in preds against the same gt and returns their TIDERuns, each registered
+        under its name in names (by default, the name of the predictions).
+
+        The gt index is built once (see Data.get_gt_index) and then shared by all of the runs.
+        Set workers to evaluate that many sets of predictions at once in a thread pool.
+        """
+        if names is None:
+            names = [x.name for x in preds]
+        if len(names) != len(preds):
+            raise ValueError("There should be one name per set of predictions.")
+
+        gt_index = gt.get_gt_index()
+
+        def evaluate(args: tuple) -> TIDERun:
+            predictions, name = args
+            return self._evaluate(
+                gt,
+                predictions,
+                pos_threshold,
+                background_threshold,
+                mode,
+                name,
+                use_for_errors,
+                gt_index=gt_index,
+            )
+
+        if workers is not None and workers > 1:
+            with ThreadPoolExecutor(workers) as pool:
+                return list(pool.map(evaluate, zip(preds, names)))
+        else:
+            return [evaluate(x) for x in zip(preds, names)]
+
+    def stream(
+        self,
+        name: str = "stream",
+        max_dets: int = 100,
+        pos_threshold: float = None,
+        background_threshold: float = None,
+        mode: str = None,
+    ) -> "TIDEStream":
+        """
+        Returns a TIDEStream to add images to one at a time. It's stored as a run under name,
+        so summarize() and the error functions include whatever was added to it so far.
+        """
+        pos_thresh = self.pos_thresh if pos_threshold is None else pos_threshold
+        bg_thresh = (
+            self.bg_thresh if background_threshold is None else background_threshold
+        )
+        mode = self.mode if mode is None else mode
+
+        run = TIDEStream(pos_thresh, bg_thresh, mode, max_dets, name)
+        self._register_run(name, run)
         return run
 
     def evaluate_range(
@@ -686,11 +1287,15 @@ class TIDE:
         if name is None:
             name = preds.name
 
-        self.run_thresholds[name] = []
+        runs = []
+
+        # The score ordering and IoUs of an image don't depend on the threshold, so each image
+        # gets one TIDEExample that matches every threshold at once when it's first built.
+        examples = {}
 
         for thresh in thresholds:
 
-            run = self.evaluate(
+            run = self._evaluate(
                 gt,
                 preds,
                 pos_threshold=thresh,
@@ -698,27 +1303,49 @@ class TIDE:
                 mode=mode,
                 name=name,
                 use_for_errors=(pos_threshold == thresh),
+                examples=examples,
+                thresholds=thresholds,
             )
 
-            self.run_thresholds[name].append(run)
+            runs.append(run)
+
+        with self._lock:
+            self.run_thresholds[name] = runs
 
     def add_qualifiers(self, *quals):
         """
         Applies any number of Qualifier objects to evaluations that have been run up to now.
         See qualifiers.py for examples.
+
+        Every annotation is tested against all of the qualifiers once, and the result is shared by
+        every run (and every threshold of a run) over the same data.
         """
-        raise NotImplementedError("Qualifiers coming soon.")
-        # for q in quals:
-        # 	for run_name, run in self.runs.items():
-        # 		if run_name in self.run_thresholds:
-        # 			# If this was a threshold run, apply the qualifier for every run
-        # 			for trun in self.run_thresholds[run_name]:
-        # 				trun.apply_qualifier(q)
-        # 		else:
-        # 			# If this had no threshold, just apply it to the main run
-        # 			run.apply_qualifier(q)
+        quals = list(quals)
+        bitmasks = {}
+
+        for run_name, run in self.runs.items():
+            # Streams don't keep their annotations around, so they can't be qualified
+            if isinstance(run, TIDEStream):
+                continue
 
-        # 	self.qualifiers[q.name] = q
+            # If this was a threshold run, apply the qualifier for every run
+            for trun in self.run_thresholds.get(run_name, [run]):
+                pred_bitmask = self._get_bitmask(trun.preds, quals, bitmasks)
+                gt_bitmask = self._get_bitmask(trun.gt, quals, bitmasks)
+
+                for bit, q in enumerate(quals):
+                    bit = np.uint64(1 << bit)
+                    trun.get_qualified_mAP(q, (pred_bitmask & bit) > 0, (gt_bitmask & bit) > 0)
+
+        for q in quals:
+            self.qualifiers[q.name] = q
+
+    def _get_bitmask(self, data: Data, quals: list, bitmasks: dict) -> np.ndarray:
+        """Returns make_bitmask(data, quals), but only makes it once per Data object in bitmasks."""
+        if id(data) not in bitmasks:
+            # Keep a reference to data, so that its id can't be reused
+            bitmasks[id(data)] = (data, make_bitmask(data, quals))
+        return bitmasks[id(data)][1]
 
     def summarize(self):
         """Summarizes the mAP values and errors for all runs in this TIDE object. Results are printed to the console."""
@@ -865,31 +1492,80 @@ class TIDE:
         # for run_name, run in self.runs.items():
         # 	self.plotter.make_summary_plot(out_dir, errors, run_name, run.mode, hbar_names=True)
 
-    def get_main_errors(self):
+    def get_main_errors(
+        self, progressive: bool = False, error_types: list = None, qual: Qualifier = None
+    ) -> dict:
+        """
+        Returns { run_name: { error_name: float } }, see TIDERun.fix_main_errors for the arguments.
+        The result is memoized until a run is evaluated again under the same name.
+        """
+        key = (progressive, None if error_types is None else tuple(error_types), qual)
         errors = {}
 
-        for run_name, run in self.runs.items():
-            if run_name in self.run_main_errors:
-                errors[run_name] = self.run_main_errors[run_name]
-            else:
-                errors[run_name] = {
+        for run_name, run in list(self.runs.items()):
+            errors[run_name] = self._get_errors(
+                self.run_main_errors,
+                run_name,
+                run,
+                key,
+                lambda: {
                     error.short_name: value
-                    for error, value in run.fix_main_errors().items()
-                }
+                    for error, value in run.fix_main_errors(progressive, error_types, qual).items()
+                },
+            )
 
         return errors
 
-    def get_special_errors(self):
+    def get_special_errors(self, qual: Qualifier = None) -> dict:
+        """
+        Returns { run_name: { error_name: float } }, see TIDERun.fix_special_errors for the arguments.
+        The result is memoized until a run is evaluated again under the same name.
+        """
         errors = {}
 
-        for run_name, run in self.runs.items():
-            if run_name in self.run_special_errors:
-                errors[run_name] = self.run_special_errors[run_name]
-            else:
-                errors[run_name] = {
+        for run_name, run in list(self.runs.items()):
+            errors[run_name] = self._get_errors(
+                self.run_special_errors,
+                run_name,
+                run,
+                (qual,),
+                lambda: {
                     error.short_name: value
-                    for error, value in run.fix_special_errors().items()
-                }
+                    for error, value in run.fix_special_errors(qual).items()
+                },
+            )
+
+        return errors
+
+    def get_qualified_errors(self):
+        """
+        Computes the main errors of every run within each of the qualifiers added with add_qualifiers.
+        See TIDERun.fix_qualified_errors.
+
+        ::
+
+            returns { run_name: { qualifier_name: { error_name: float } } }
+        """
+        quals = list(self.qualifiers.values())
+        bitmasks = {}
+        errors = {}
+
+        for run_name, run in self.runs.items():
+            # Streams don't keep their annotations around, so they can't be qualified
+            if isinstance(run, TIDEStream) or len(quals) == 0:
+                errors[run_name] = {}
+                continue
+
+            qualified_errors = run.fix_qualified_errors(
+                quals,
+                pred_bitmask=self._get_bitmask(run.preds, quals, bitmasks),
+                gt_bitmask=self._get_bitmask(run.gt, quals, bitmasks),
+            )
+
+            errors[run_name] = {
+                qual.name: {error.short_name: value for error, value in qual_errors.items()}
+                for qual, qual_errors in qualified_errors.items()
+            }
 
         return errors
 
@@ -903,3 +1579,169 @@ class TIDE:
             }
         """
         return {"main": self.get_main_errors(), "special": self.get_special_errors()}
+
+
+class TIDEStream(TIDERun):
+    """
+    A TIDERun that's built up one image at a time, e.g., as the detections come out of a model.
+
+    Each image is evaluated as soon as it's added, after which only its AP data points (as NumPy arrays,
+    see CompactAPDataObject), its errors and a compact row (without the mask) for every annotation those
+    errors refer to are kept, so memory doesn't grow with the raw annotations or with Python objects. The mAP and errors can be read at any time and cover all of
+    the images added so far. False negatives are only counted, see false_negative_counts.
+    """
+
+    # What's kept of the annotations that errors refer to
+    _annotation_dtype = np.dtype(
+        [
+            ("_id", np.int64),
+            ("image", np.int64),
+            ("class", np.int64),
+            ("score", np.float64),
+            ("bbox", np.float64, (4,)),
+        ]
+    )
+
+    def __init__(
+        self,
+        pos_thresh: float = 0.5,
+        bg_thresh: float = 0.1,
+        mode: str = TIDE.BOX,
+        max_dets: int = 100,
+        name: str = "stream",
+    ):
+        self.name = name
+        self._num_anns = 0
+
+        super().__init__(
+            Data(name + "_gt", max_dets),
+            Data(name, max_dets),
+            pos_thresh,
+            bg_thresh,
+            mode,
+            max_dets,
+            image_ids=[],
+        )
+
+        self.ap_data = CompactClassedAPDataObject()
+
+        # The number of false negatives of each class, since classes aren't known up front
+        self._false_negatives = defaultdict(int)
+        # Chunks of rows of _annotation_dtype for the annotations referred to by the errors, sorted by id
+        self._annotation_chunks = []
+
+    def _run(self):
+        # Images are evaluated as they're added instead
+        pass
+
+    def _add_false_negatives(self, ids: np.ndarray, classes: np.ndarray):
+        for _cls in classes.tolist():
+            self._false_negatives[_cls] += 1
+
+    @property
+    def false_negatives(self) -> dict:
+        raise AttributeError("A TIDEStream only counts its false negatives, see false_negative_counts.")
+
+    @property
+    def false_negative_counts(self) -> dict:
+        return dict(self._false_negatives)
+
+    def _get_annotation(self, _id: int) -> dict:
+        """Creates the annotation dict of one of the annotations the errors refer to, without its mask."""
+        if len(self._annotation_chunks) != 1:
+            self._annotation_chunks = [
+                np.concatenate([np.zeros(0, self._annotation_dtype)] + self._annotation_chunks)
+            ]
+        table = self._annotation_chunks[0]
+        row = table[np.searchsorted(table["_id"], _id)]
+
+        class_id = int(row["class"])
+        return {
+            "_id": _id,
+            "score": float(row["score"]),
+            "image": int(row["image"]),
+            "class": None if class_id == _NO_CLASS else class_id,
+            "bbox": None if np.isnan(row["bbox"][0]) else row["bbox"].tolist(),
+            "mask": None,
+            "ignore": False,
+        }
+
+    def _get_pred(self, _id: int) -> dict:
+        return self._get_annotation(_id)
+
+    def _get_gt(self, _id: int) -> dict:
+        return self._get_annotation(_id)
+
+    @property
+    def ap(self) -> float:
+        return self.ap_data.get_mAP()
+
+    def add(self, image_id: int, gts: list, preds: list):
+        """
+        Evaluates one image. gts and preds are lists of dicts with a "class" and a "bbox" and / or "mask".
+        Predictions also need a "score", and gts with "ignore" set to True are used as ignore regions.
+        """
+        gt = AnnotationView.from_list(
+            [self._make_annotation(image_id, x, 1, x.get("ignore", False)) for x in gts]
+        )
+        preds = AnnotationView.from_list(
+            [self._make_annotation(image_id, x, x["score"], False) for x in preds]
+        )
+
+        num_chunks = len(self._error_chunks)
+        self._eval_image(preds, ImageGT(gt))
+
+        # Only keep a row for each annotation the new errors refer to, the rest is dropped with the views
+        new_rows = self._error_chunks[num_chunks:]
+        if len(new_rows) > 0:
+            new_rows = np.concatenate(new_rows)
+            referenced = np.concatenate([new_rows["pred"], new_rows["gt"], new_rows["suppressor"]])
+
+            # The gt come first, and ids are given out in that order, so the rows stay sorted by id
+            for view in (gt, preds):
+                keep = np.isin(view.ids, referenced)
+                rows = np.zeros(int(keep.sum()), self._annotation_dtype)
+                rows["_id"] = view.ids[keep]
+                rows["image"] = image_id
+                rows["class"] = view.classes[keep]
+                rows["score"] = view.scores[keep]
+                rows["bbox"] = view.boxes[keep]
+                self._annotation_chunks.append(rows)
+
+        self._ap_fixer = None
+
+    def _make_annotation(self, image_id: int, annotation: dict, score: float, ignore: bool) -> dict:
+        """Converts an annotation to the dict format TIDERun uses, giving it an id that's unique to this stream."""
+        self._num_anns += 1
+
+        return {
+            "_id": self._num_anns - 1,
+            "score": float(score),
+            "image": image_id,
+            "class": annotation["class"],
+            "bbox": annotation.get("bbox"),
+            "mask": annotation.get("mask"),
+            "ignore": bool(ignore),
+        }
+
+    def summarize(self) -> dict:
+        """
+        ::
+
+            returns {
+                'ap'     : float,
+                'main'   : { error_name: float },
+                'special': { error_name: float },
+            }
+        """
+        return {
+            "ap": self.ap,
+            "main": {
+                error.short_name: value
+                for error, value in self.fix_main_errors().items()
+            },
+            "special": {
+                error.short_name: value
+                for error, value in self.fix_special_errors().items()
+            },
+        }